@@ -1,7 +1,25 @@
 from enum import Flag, auto
 from datetime import datetime
 from itertools import chain
+from array import array
 import re
+import sys
+import threading
+
+from allocation import allocation_map, fat_free_runs, format_space, fragmentation_stats, space_stats
+from carve import carve
+from device import BlockDevice, device_path
+from export_sqlite import export_sqlite
+from fat_check import check_fat, contiguous_run_ends, masked_table
+from dupes import find_duplicates
+from extract import extract_files
+from fileio import VolumeFile, read_extents
+import instrument
+from hashing import DEFAULT_ALGORITHMS, compute_hashes
+from search import SearchIndex
+from sniff import sniff_types
+from timeline import datetime_to_filetime, export_timeline
+from usage import UsageTable
 
 class Attribute(Flag):
     """Lớp định nghĩa các thuộc tính file/thư mục trong FAT32"""
@@ -17,21 +35,77 @@ class FAT:
     def __init__(self, data) -> None:
         # Khởi tạo bảng FAT từ dữ liệu nhị phân
         self.raw_data = data
-        self.elements = []
-        # Phân tích cấu trúc bảng FAT
-        for i in range(0, len(self.raw_data), 4):
-            self.elements.append(int.from_bytes(self.raw_data[i:i + 4], byteorder='little'))
+        # Phân tích cấu trúc bảng FAT: mỗi phần tử 4 byte little-endian, nạp nguyên khối
+        self.elements = array('I')
+        self.elements.frombytes(self.raw_data[:len(self.raw_data) // 4 * 4])
+        if sys.byteorder == 'big':
+            self.elements.byteswap()
+        # run_end[c]: cluster ngay sau đoạn liên tiếp chứa c (xem index_runs), None khi chưa dựng
+        self.run_end = None
     
+    def index_runs(self, first: int, end: int) -> array:
+        # Dựng bảng đoạn liên tiếp một lượt trên cả mảng (chạy trong C, xem fat_check.contiguous_run_ends)
+        # để get_extents nhảy qua cả đoạn thay vì đi từng cluster
+        if self.run_end is None:
+            end = min(end, len(self.elements))
+            raw, _ = masked_table(self.raw_data, end)
+            self.run_end = contiguous_run_ends(raw, first, end)
+        return self.run_end
+
+    def get_extents(self, index: int, max_clusters=None) -> 'list[tuple[int, int]]':
+        # Chuỗi cluster dạng các đoạn liên tiếp (cluster đầu, số cluster), tối đa max_clusters cluster.
+        # Khi đã có run_end mỗi bước đi hết một đoạn, nên chi phí theo số đoạn chứ không theo số cluster
+        run_end = self.run_end
+        limit = len(self.elements)
+        extents = []
+        total = 0
+        while max_clusters is None or total < max_clusters:
+            stop = run_end[index] if run_end is not None and index < len(run_end) else 0
+            count = stop - index if stop > index + 1 else 1
+            if max_clusters is not None:
+                count = min(count, max_clusters - total)
+            if extents and extents[-1][0] + extents[-1][1] == index:
+                extents[-1][1] += count
+            else:
+                extents.append([index, count])
+            total += count
+            index = self.elements[index + count - 1] & 0x0FFFFFFF
+            if index >= 0x0FFFFFF7 or index < 2 or index >= limit:
+                break
+            if total >= limit:
+                raise ValueError(f"Cluster chain loop at cluster {index}")
+        return [(start, count) for start, count in extents]
+
+    def free_runs(self, first: int, end: int) -> 'list[tuple[int, int]]':
+        # Các đoạn cluster trống (entry = 0) trong [first, end)
+        return fat_free_runs(self.raw_data, first, min(end, len(self.elements)))
+
     def get_cluster_chain(self, index: int) -> 'list[int]':
         # Trả về chuỗi cluster liên tiếp của file/thư mục
+        # Chỉ dùng 28 bit thấp; 0x0FFFFFF8..0x0FFFFFFF là cuối chuỗi, 0x0FFFFFF7 là cluster hỏng.
+        # Chuỗi dài hơn số entry của bảng chắc chắn có vòng lặp (FAT hỏng): dừng thay vì treo
         index_list = []
+        limit = len(self.elements)
         while True:
             index_list.append(index)
-            index = self.elements[index]
-            if index == 0x0FFFFFFF or index == 0x0FFFFFF7:
+            index = self.elements[index] & 0x0FFFFFFF
+            if index >= 0x0FFFFFF7 or index < 2 or index >= limit:
                 break
+            if len(index_list) >= limit:
+                raise ValueError(f"Cluster chain loop at cluster {index}")
         return index_list 
 
+def parse_fsinfo(sector: bytes) -> dict:
+    # Sector FSInfo: số cluster trống và gợi ý cluster trống kế tiếp (0xFFFFFFFF = không rõ); None nếu sai chữ ký
+    if len(sector) < 0x200 or sector[:4] != b"RRaA" or sector[0x1E4:0x1E8] != b"rrAa":
+        return None
+    free = int.from_bytes(sector[0x1E8:0x1EC], byteorder='little')
+    next_free = int.from_bytes(sector[0x1EC:0x1F0], byteorder='little')
+    return {
+        "free_clusters": None if free == 0xFFFFFFFF else free,
+        "next_free": None if next_free == 0xFFFFFFFF else next_free,
+    }
+
 class RDET_entry:
     """Lớp biểu diễn 1 entry trong thư mục (32 bytes)"""
     def __init__(self, data):
@@ -185,14 +259,23 @@ class RDET:
         self.raw_data: bytes = data
         self.entries: list[RDET_entry] = []
         long_name = ""
+        deleted_name = ""
         for i in range(0, len(data), 32):
             entry = RDET_entry(data[i:i+32])
             self.entries.append(entry)
-            if entry.is_empty or entry.is_deleted:
-                long_name = ""
+            if entry.is_empty:
+                long_name = deleted_name = ""
                 continue
             if entry.is_subentry:
-                long_name = entry.name + long_name
+                # Subentry đã xóa (byte đầu 0xE5) vẫn giữ được các ký tự của tên dài
+                if entry.raw_data[0] == 0xE5:
+                    deleted_name = entry.name + deleted_name
+                else:
+                    long_name = entry.name + long_name
+                continue
+            if entry.is_deleted:
+                entry.long_name = deleted_name or self._construct_short_name(entry)
+                long_name = deleted_name = ""
                 continue
 
             if long_name != "":
@@ -204,7 +287,10 @@ class RDET:
     def _construct_short_name(self, entry):
         # Tạo tên file đầy đủ từ tên ngắn và phần mở rộng
         ext = entry.ext.strip().decode(errors='replace')
-        name = entry.name.strip().decode(errors='replace')
+        name = entry.name.strip()
+        if entry.is_deleted:
+            name = b"_" + name[1:]  # Ký tự đầu đã bị ghi đè bởi 0xE5
+        name = name.decode(errors='replace')
     
         if name == "." or name == "..":
             return name
@@ -219,6 +305,14 @@ class RDET:
             and entry.long_name not in (".", "..")  # Thêm điều kiện lọc
         ]
 
+    def list_allocated_entries(self) -> 'list[RDET_entry]':
+        # Mọi entry file/thư mục còn cấp phát, kể cả entry có thuộc tính system/hidden
+        return [
+            entry for entry in self.entries
+            if not (entry.is_empty or entry.is_subentry or entry.is_deleted or entry.is_label)
+            and entry.long_name not in (".", "..")
+        ]
+
     def find_entry(self, name) -> RDET_entry:
         # Tìm entry theo tên trong thư mục
         lower_name = name.lower()
@@ -240,12 +334,18 @@ class FAT32:
         "start_sector_Data",
         "FAT_type"
     ]
-    def __init__(self, name: str) -> None:
+    def __init__(self, name: str, device=None) -> None:
         # Khởi tạo và đọc thông tin boot sector
+        # device: thiết bị đã mở sẵn (vd. PartitionView của một phân vùng trên ảnh đĩa, xem partition.py)
         self.name = name
         self.cwd = [self.name]
         try:
-            self.fd = open(r'\\.\%s' % self.name, 'rb')
+            if device is None:
+                self.fd = instrument.wrap(open(device_path(self.name), 'rb'))
+                self.dev = BlockDevice(self.fd)
+            else:
+                self.fd = None
+                self.dev = device
         except FileNotFoundError:
             print(f"[ERROR] No volume named {name}")
             exit()
@@ -258,9 +358,10 @@ class FAT32:
             exit() 
         
         try:
-            self.boot_sector_raw = self.fd.read(0x200)
-            self.boot_sector = {}
-            self.parse_boot_sector()
+            with instrument.phase("boot_sector"):
+                self.boot_sector_raw = self.dev.read_at(0, 0x200)
+                self.boot_sector = {}
+                self.parse_boot_sector()
             if self.boot_sector["FAT_type"] != b"FAT32   ":
                 raise Exception("Not FAT32")
             self.boot_sector["FAT_type"] = self.boot_sector["FAT_type"].decode()
@@ -269,19 +370,36 @@ class FAT32:
             self.NF = self.boot_sector["number_of_FAT"]
             self.SC = self.boot_sector["sectors_per_cluster"]
             self.BS = self.boot_sector["bytes_per_sector"]
-            self.boot_sector_reserved_raw = self.fd.read(self.BS * (self.SB - 1))
+            self.boot_sector_reserved_raw = self.dev.read_at(0x200, self.BS * (self.SB - 1))
             
             FAT_size = self.BS * self.SF
             self.FAT: list[FAT] = []
-            for _ in range(self.NF):
-                self.FAT.append(FAT(self.fd.read(FAT_size)))
+            with instrument.phase("fat_load"):
+                for i in range(self.NF):
+                    self.FAT.append(FAT(self.dev.read_at(self.BS * self.SB + i * FAT_size, FAT_size)))
 
             self.DET = {}
+            # Bảo vệ các cache dựng lười (DET, index tìm kiếm, bảng dung lượng) khi nhiều thread dùng chung volume
+            self.cache_lock = threading.RLock()
+            self.search_index = None
+            self.usage = None
+            # Kết quả sniff_types() theo (đường dẫn, kích thước, cluster đầu)
+            self.sniff_cache = {}
             
             start = self.boot_sector["start_cluster_RDET"]
             self.DET[start] = RDET(self.read_cluster_chain(start))
             self.RDET = self.DET[start]
 
+            # FSInfo (thường ở sector 1, nằm trong vùng reserved đã đọc) cho số cluster trống tức thì
+            fsinfo_sector = self.read_boot_param(0x30, 2)
+            self.fsinfo = None
+            if 1 <= fsinfo_sector < self.SB:
+                self.fsinfo = parse_fsinfo(self.boot_sector_reserved_raw[(fsinfo_sector - 1) * self.BS:fsinfo_sector * self.BS])
+            self.label = self.read_label()
+            # Gợi ý FSInfo có thể đã cũ (vd. ổ bị rút không an toàn): chỉ đếm lại từ FAT khi được yêu cầu (start_verification)
+            self.verified_free = None
+            self.stats_thread = None
+
         except Exception as e:
             print(f"[ERROR] {e}")
             exit()
@@ -289,15 +407,17 @@ class FAT32:
     @staticmethod
     def is_fat32(name: str):
         try:
-            with open(r'\\.\%s' % name, 'rb') as fd:
-                fd.read(1)
-                fd.seek(0x52)
-                fat_name = fd.read(8)
-                return fat_name == b"FAT32   "
+            with open(device_path(name), 'rb') as fd:
+                return FAT32.is_fat32_boot(fd.read(0x200))
         except Exception as e:
             print(f"[ERROR] {e}")
             exit()
 
+    @staticmethod
+    def is_fat32_boot(boot_sector: bytes) -> bool:
+        # Nhận dạng FAT32 từ boot sector đã đọc (không mở lại thiết bị)
+        return boot_sector[0x52:0x5A] == b"FAT32   "
+
     def parse_boot_sector(self):
         # Trích xuất thông tin từ boot sector
         self.boot_sector['bytes_per_sector'] = self.read_boot_param(0xB, 2)
@@ -340,27 +460,285 @@ class FAT32:
                 # Thêm kiểm tra cluster hợp lệ
                 if entry.start_cluster == 0:
                     continue  # Bỏ qua thư mục gốc ảo
-                if entry.start_cluster not in self.DET:
-                    self.DET[entry.start_cluster] = RDET(self.read_cluster_chain(entry.start_cluster))
-                cdet = self.DET[entry.start_cluster]
+                cdet = self.read_directory(entry)
             else:
                 raise NotADirectoryError(f"'{d}' is not a directory")
         return cdet
+
+    def read_directory(self, entry) -> RDET:
+        # Đọc (và lưu cache) RDET của một entry thư mục
+        rdet = self.DET.get(entry.start_cluster)
+        if rdet is not None:
+            if instrument.enabled:
+                instrument.cache_hit()
+            return rdet
+        if instrument.enabled:
+            instrument.cache_miss()
+        # Đọc và parse ngoài lock; nếu thread khác đã kịp lưu thì dùng bản đó
+        data = self.read_cluster_chain(entry.start_cluster)
+        with instrument.phase("directory_parse"):
+            rdet = RDET(data)
+        with self.cache_lock:
+            return self.DET.setdefault(entry.start_cluster, rdet)
+
+    def entry_info(self, entry) -> dict:
+        return {
+            "Flags": entry.attr.value,
+            "Date Modified": entry.date_updated,
+            "Size": entry.size,
+            "Name": entry.long_name,
+            "Sector": (entry.start_cluster + 2) * self.SC if entry.start_cluster == 0 else entry.start_cluster * self.SC
+        }
   
     def list_directory(self, dir=""):
         # Lấy danh sách các entry trong thư mục hiện tại
         try:
             cdet = self.open_directory(dir)
             entry_list = cdet.list_valid_entries()
-            return [{
-                "Flags": entry.attr.value,
-                "Date Modified": entry.date_updated,
-                "Size": entry.size,
-                "Name": entry.long_name,
-                "Sector": (entry.start_cluster + 2) * self.SC if entry.start_cluster == 0 else entry.start_cluster * self.SC
-            } for entry in entry_list]
+            return [self.entry_info(entry) for entry in entry_list]
         except Exception as e:
             raise e
+
+    def walk(self, dir="", from_root=False, include_hidden=False):
+        # Duyệt đệ quy (DFS) toàn bộ cây con, trả về info kèm "Path" và "Node"
+        # from_root=True: duyệt cả volume từ thư mục gốc, không phụ thuộc cwd
+        # include_hidden=True: gồm cả entry có thuộc tính system (băm/quét toàn bộ ảnh)
+        if from_root:
+            stack = [("", self.DET[self.boot_sector["start_cluster_RDET"]])]
+        else:
+            prefix = "\\".join(self.parse_path(dir)) if dir else ""
+            stack = [(prefix, self.open_directory(dir))]
+        visited = set()
+        while stack:
+            prefix, cdet = stack.pop()
+            for entry in cdet.list_allocated_entries() if include_hidden else cdet.list_valid_entries():
+                info = self.entry_info(entry)
+                info["Path"] = f"{prefix}\\{entry.long_name}" if prefix else entry.long_name
+                info["Node"] = entry
+                yield info
+                if entry.is_directory() and entry.start_cluster >= 2 and entry.start_cluster not in visited:
+                    visited.add(entry.start_cluster)
+                    stack.append((info["Path"], self.read_directory(entry)))
+
+    def cluster_count(self) -> int:
+        # Số cluster vùng dữ liệu
+        return (self.boot_sector["volume_size"] - self.boot_sector["start_sector_Data"]) // self.SC
+
+    def cluster_range(self) -> 'tuple[int, int]':
+        # Khoảng chỉ số cluster hợp lệ [2, 2 + số cluster)
+        return 2, 2 + self.cluster_count()
+
+    def cluster_byte_offset(self, index) -> int:
+        return self.offset_from_cluster(index) * self.BS
+
+    def read_label(self) -> str:
+        # Nhãn volume: entry nhãn trong thư mục gốc (Windows cập nhật entry này), nếu không có thì lấy từ boot sector
+        for entry in self.RDET.entries:
+            if entry.is_label and not entry.is_deleted and not entry.is_subentry:
+                return entry.raw_data[:11].decode(errors='replace').strip()
+        label = self.boot_sector_raw[0x47:0x52].decode(errors='replace').strip()
+        return "" if label == "NO NAME" else label
+
+    def verify_free_clusters(self):
+        # Đếm số cluster trống thực tế trên FAT (bảng FAT đã nằm trong bộ nhớ, không đọc thiết bị)
+        first, end = self.cluster_range()
+        self.verified_free = sum(length for _, length in self.FAT[0].free_runs(first, end))
+
+    def start_verification(self) -> threading.Thread:
+        # Bắt đầu đếm lại số cluster trống ở thread nền (một lần cho mỗi volume); trả về thread để chờ nếu cần
+        with self.cache_lock:
+            if self.stats_thread is None:
+                self.stats_thread = threading.Thread(target=self.verify_free_clusters, daemon=True)
+                self.stats_thread.start()
+        return self.stats_thread
+
+    def volume_stats(self, verify=False) -> dict:
+        # Dung lượng tổng/trống/đã dùng và nhãn volume, không cần duyệt cây thư mục.
+        # Số trống lấy từ FAT nếu đã đếm (verify=True: đếm và chờ kết quả), nếu không thì từ gợi ý FSInfo
+        if verify:
+            self.start_verification().join()
+        total = self.cluster_count()
+        hint = self.fsinfo["free_clusters"] if self.fsinfo else None
+        if hint is not None and hint > total:
+            hint = None  # Gợi ý vô lý
+        if self.verified_free is not None:
+            free, source = self.verified_free, "FAT"
+        else:
+            free, source = hint, "FSInfo" if hint is not None else None
+        stats = space_stats(total, free, self.SC * self.BS)
+        stats.update({
+            "Label": self.label,
+            "Free source": source,
+            "FSInfo free clusters": hint,
+            "FSInfo next free": self.fsinfo["next_free"] if self.fsinfo else None,
+            "FSInfo valid": None if self.verified_free is None or hint is None else hint == self.verified_free,
+        })
+        return stats
+
+    def allocation_map(self) -> dict:
+        # Bản đồ cluster trống/đã dùng (dạng run-length) từ bảng FAT
+        first, end = self.cluster_range()
+        return allocation_map(self.FAT[0].free_runs(first, end), first, end)
+
+    def check(self) -> dict:
+        # Kiểm tra nhất quán bảng FAT: cross-link, chuỗi thất lạc, vòng lặp, bản sao FAT (xem fat_check.py)
+        return check_fat(self)
+
+    def carve(self, free_only=False, types=None, max_workers=None, aligned=True):
+        # Khôi phục file theo chữ ký trên vùng dữ liệu (xem carve.py)
+        return carve(self, free_only, types, max_workers, aligned)
+
+    def fragmentation(self, top=10) -> dict:
+        # Dựng bảng đoạn liên tiếp trước để extent của mỗi file được lấy theo đoạn, không theo từng cluster
+        with self.cache_lock:
+            self.FAT[0].index_runs(*self.cluster_range())
+        return fragmentation_stats(self, top)
+
+    def timeline_entries(self):
+        # (đường dẫn, kích thước, cluster đầu, nguồn, mốc (M, A, C, B) dạng FILETIME); FAT không có mốc thay đổi (C)
+        for info in self.walk(from_root=True):
+            entry = info["Node"]
+            yield info["Path"], entry.size, entry.start_cluster, "FAT", (
+                datetime_to_filetime(entry.date_updated), datetime_to_filetime(entry.last_accessed),
+                None, datetime_to_filetime(entry.date_created))
+
+    def diff_entries(self):
+        # (khóa, đường dẫn, thư mục?, kích thước, mtime FILETIME, extent, entry) cho diff.py; FAT32 không có
+        # số định danh bền vững nên khóa là đường dẫn (không phân biệt hoa thường)
+        for info in self.walk(from_root=True):
+            entry = info["Node"]
+            yield (info["Path"].upper(), info["Path"], entry.is_directory(), entry.size,
+                   datetime_to_filetime(entry.date_updated), tuple(self.get_extents(entry)), entry)
+
+    def timeline(self, out_path: str, fmt="csv") -> dict:
+        # Xuất timeline MAC đã sắp xếp (CSV) hoặc body file (xem timeline.py)
+        return export_timeline(self, out_path, fmt)
+
+    def volume_meta(self) -> dict:
+        # Thông số nhận dạng volume ghi vào bảng meta của CSDL xuất ra
+        return {
+            "File system": "FAT32",
+            "Serial": "%08X" % int.from_bytes(self.boot_sector_raw[0x43:0x47], byteorder='little'),
+            "Volume size": self.boot_sector["volume_size"],
+            "Sectors per cluster": self.SC,
+            "Offset": getattr(self.dev, "base", 0),
+        }
+
+    def sqlite_rows(self):
+        # (dòng entry, các dòng stream, các dòng extent) cho export_sqlite(); id đánh số theo thứ tự duyệt, gốc là 0
+        ids = {"": 0}
+        yield (0, None, "", "", 0, Attribute.directory.value, 1, None) + (None,) * 9, [], []
+        for info in self.walk(from_root=True):
+            entry = info["Node"]
+            path = info["Path"]
+            entry_id = len(ids)
+            ids[path] = entry_id
+            row = (entry_id, ids.get(path.rpartition("\\")[0], 0), entry.long_name, path, entry.size, entry.attr.value,
+                   int(entry.is_directory()), None, datetime_to_filetime(entry.date_updated),
+                   datetime_to_filetime(entry.last_accessed), None, datetime_to_filetime(entry.date_created),
+                   None, None, None, None, None)
+            extents = [("", seq, start, count) for seq, (start, count) in enumerate(self.get_extents(entry))]
+            yield row, [("", entry.size, 0, 0, 0, 0, None)], extents
+
+    def export_sqlite(self, db_path: str) -> dict:
+        # Xuất metadata mọi entry ra SQLite (xem export_sqlite.py)
+        return export_sqlite(self, db_path)
+
+    def scan_deleted(self):
+        # Duyệt mọi thư mục (1 lượt, dùng lại cache DET) và sinh thông tin các entry đã xóa
+        root = self.boot_sector["start_cluster_RDET"]
+        stack = [("", self.DET[root])]
+        visited = {root}
+        while stack:
+            prefix, cdet = stack.pop()
+            for entry in cdet.entries:
+                if entry.is_subentry or entry.is_empty or entry.is_label or entry.long_name in (".", ".."):
+                    continue
+                path = f"{prefix}\\{entry.long_name}" if prefix else entry.long_name
+                if entry.is_deleted:
+                    info = self.deleted_entry_info(entry, path)
+                    yield info
+                    # Thư mục đã xóa: chỉ đọc khi cluster đầu chưa bị cấp phát lại
+                    if entry.is_directory() and info["Extents"] and info["Recoverable"] and entry.start_cluster not in visited:
+                        visited.add(entry.start_cluster)
+                        start, count = info["Extents"][0]
+                        try:
+                            stack.append((path, RDET(self.read_clusters(start, count))))
+                        except ValueError:
+                            pass  # Dữ liệu không còn là bảng thư mục hợp lệ
+                elif entry.is_directory() and entry.start_cluster >= 2 and entry.start_cluster not in visited:
+                    visited.add(entry.start_cluster)
+                    stack.append((path, self.read_directory(entry)))
+
+    def deleted_entry_info(self, entry, path) -> dict:
+        info = self.entry_info(entry)
+        extents = self.get_extents(entry)
+        # Cluster khác 0 trong FAT nghĩa là đã bị file khác cấp phát lại
+        overwritten = sum(count - self.FAT[0].elements[start:start + count].count(0) for start, count in extents)
+        info.update({
+            "Path": path,
+            "Extents": extents,
+            "Overwritten clusters": overwritten,
+            "Recoverable": overwritten == 0,
+            "Node": entry,
+        })
+        return info
+
+    def read_clusters(self, start, count) -> bytes:
+        return self.dev.read_at(self.offset_from_cluster(start) * self.BS, count * self.SC * self.BS)
+
+    def usage_nodes(self):
+        # Sinh (key, parent_key, path, size, clusters, is_dir) theo thứ tự tiền tự cho UsageTable
+        cluster_bytes = self.SC * self.BS
+        root = self.boot_sector["start_cluster_RDET"]
+        yield root, None, "", 0, len(self.FAT[0].get_cluster_chain(root)), True
+        stack = [(root, "", self.DET[root])]
+        # Thư mục hỏng có thể trỏ ngược về thư mục tổ tiên: mỗi cluster đầu chỉ được duyệt một lần (như walk)
+        visited = {root}
+        while stack:
+            key, prefix, cdet = stack.pop()
+            for entry in cdet.list_valid_entries():
+                path = f"{prefix}\\{entry.long_name}" if prefix else entry.long_name
+                if entry.is_directory():
+                    if entry.start_cluster < 2 or entry.start_cluster in visited:
+                        continue
+                    visited.add(entry.start_cluster)
+                    chain = self.FAT[0].get_cluster_chain(entry.start_cluster)
+                    yield entry.start_cluster, key, path, 0, len(chain), True
+                    stack.append((entry.start_cluster, path, self.read_directory(entry)))
+                else:
+                    yield None, key, path, entry.size, -(-entry.size // cluster_bytes), False
+
+    def du(self, path="") -> dict:
+        # Tổng dung lượng đệ quy của thư mục (đường dẫn tính từ gốc volume)
+        if self.usage is None:
+            with self.cache_lock:
+                if self.usage is None:
+                    self.usage = UsageTable(self)
+        return self.usage.du("\\".join(self.parse_path(path)))
+
+    def top_subtrees(self, n=10) -> 'list[dict]':
+        # n thư mục con chiếm nhiều dung lượng nhất
+        if self.usage is None:
+            with self.cache_lock:
+                if self.usage is None:
+                    self.usage = UsageTable(self)
+        return self.usage.largest(n)
+
+    def find(self, pattern, size_range=None, mtime_range=None, attrs=None):
+        # Tìm kiếm theo tên/kích thước/thời gian trên index dựng sẵn (xem search.py)
+        if self.search_index is None:
+            with self.cache_lock:
+                if self.search_index is None:
+                    self.search_index = SearchIndex(self)
+        return self.search_index.find(pattern, size_range, mtime_range, attrs)
+
+    def lookup(self, path: str):
+        # Trả về entry (file hoặc thư mục) theo đường dẫn, None nếu không có
+        try:
+            return self.find_entry(self.parse_path(path))
+        except NotADirectoryError:
+            return None
       
     def change_dir(self, path=""):
         # Thay đổi thư mục làm việc hiện tại
@@ -378,11 +756,8 @@ class FAT32:
     def read_cluster_chain(self, cluster_index):
         # Đọc toàn bộ dữ liệu từ chuỗi cluster
         index_list = self.FAT[0].get_cluster_chain(cluster_index)
-        data = b""
-        for i in index_list:
-            self.fd.seek(self.offset_from_cluster(i) * self.BS)
-            data += self.fd.read(self.SC * self.BS)
-        return data
+        cluster_bytes = self.SC * self.BS
+        return b"".join(self.dev.read_many([(self.offset_from_cluster(i) * self.BS, cluster_bytes) for i in index_list]))
   
     def read_text_file(self, path: str) -> str:
         # Đọc nội dung file văn bản
@@ -402,20 +777,79 @@ class FAT32:
         return self.RDET.find_entry(path_parts[0])
 
     def read_file_content(self, entry):
-        data = bytearray()
+        return self.read_file_bytes(entry).decode(errors='replace')
+
+    def read_file_bytes(self, entry) -> bytes:
+        # Đọc nội dung nhị phân nguyên bản của file
+        return b"".join(self.iter_file_content(entry))
+
+    def read_range(self, entry, offset, size, extents=None) -> bytes:
+        # Đọc size byte bắt đầu tại byte offset của file (đọc theo vị trí, không đọc cả file).
+        # extents: danh sách đoạn đã tính sẵn (VolumeFile giữ cho cả vòng đời file); nếu không có thì
+        # chỉ lần theo chuỗi FAT tới cluster chứa byte cuối cần đọc
+        size = max(0, min(size, entry.size - offset))
+        if size == 0:
+            return b""
+        if extents is None:
+            extents = self.get_extents(entry, -(-(offset + size) // (self.SC * self.BS)))
+        return read_extents(self, extents, offset, size)
+
+    def open_file(self, path: str) -> VolumeFile:
+        # Mở file dạng file object chỉ đọc, seek được
+        entry = self.lookup(path)
+        if not entry:
+            raise FileNotFoundError("File not found")
+        if entry.is_directory():
+            raise IsADirectoryError("Is a directory")
+        return VolumeFile(self, entry, entry.size, path)
+
+    def get_extents(self, entry, max_clusters=None) -> 'list[tuple[int, int]]':
+        # Gom chuỗi cluster thành các đoạn liên tiếp (cluster đầu, số cluster); max_clusters: chỉ lấy phần đầu chuỗi
+        if entry.start_cluster < 2:
+            return []
+        if entry.is_deleted:
+            # Chuỗi FAT của entry đã xóa bị giải phóng: giả định các cluster liên tiếp
+            count = max(1, -(-entry.size // (self.SC * self.BS)))
+            count = min(count, 2 + self.cluster_count() - entry.start_cluster)
+            return [(entry.start_cluster, count)] if count > 0 else []
+        if not entry.is_directory():
+            file_clusters = -(-entry.size // (self.SC * self.BS))
+            max_clusters = file_clusters if max_clusters is None else min(max_clusters, file_clusters)
+        return self.FAT[0].get_extents(entry.start_cluster, max_clusters)
+
+    def iter_file_content(self, entry, chunk_size=1 << 20):
+        # Đọc tuần tự theo từng đoạn cluster liên tiếp, mỗi lần tối đa chunk_size byte
+        cluster_bytes = self.SC * self.BS
         remaining = entry.size
-        for cluster in self.FAT[0].get_cluster_chain(entry.start_cluster):
-            if remaining <= 0:
-                break
-            self.fd.seek(self.offset_from_cluster(cluster) * self.BS)
-            read_size = min(self.SC * self.BS, remaining)
-            data.extend(self.fd.read(read_size))
-            remaining -= read_size
-        return data.decode(errors='replace')
+        for start, count in self.get_extents(entry):
+            offset = self.offset_from_cluster(start) * self.BS
+            length = min(count * cluster_bytes, remaining)
+            remaining -= length
+            while length > 0:
+                read_size = min(chunk_size, length)
+                yield self.dev.read_at(offset, read_size)
+                offset += read_size
+                length -= read_size
+
+    def extract(self, path: str, dest_dir: str, max_workers=4) -> dict:
+        # Sao chép nguyên bản file/thư mục ra đĩa (xem extract.py)
+        return extract_files(self, path, dest_dir, max_workers)
+
+    def find_duplicates(self, path="", min_size=1, max_workers=4):
+        # Nhóm file trùng nội dung: kích thước -> băm cluster đầu/cuối -> băm toàn bộ (xem dupes.py)
+        return find_duplicates(self, path, min_size, max_workers)
+
+    def sniff_types(self, path="", max_workers=4):
+        # Nhận dạng loại file theo nội dung (chữ ký + entropy 4 KB đầu), có cache theo entry (xem sniff.py)
+        return sniff_types(self, path, max_workers)
+
+    def hash_files(self, path="", algorithms=DEFAULT_ALGORITHMS, max_workers=4):
+        # Băm nội dung file (nhiều thuật toán, 1 lượt đọc), trả về (manifest, thống kê)
+        return compute_hashes(self, path, algorithms, max_workers)
 
     def __str__(self) -> str:
         info = "\n".join(f"{k}: {v}" for k, v in self.boot_sector.items() if k in self.info)
-        return f"Volume name: {self.name}\nVolume information:\n{info}"
+        return f"Volume name: {self.name}\nVolume label: {self.label}\nVolume information:\n{info}\n{format_space(self.volume_stats())}"
 
     def __del__(self):
         if hasattr(self, 'fd') and self.fd:
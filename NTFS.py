@@ -1,6 +1,33 @@
+import os
 import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from collections import OrderedDict
 from enum import Flag, auto
 from datetime import datetime
+
+from allocation import allocation_map, bitmap_free_runs, count_set_bits, format_space, fragmentation_stats, space_stats
+from carve import carve
+from device import BlockDevice, device_path
+from export_sqlite import export_sqlite, iter_cached_entries, open_cache
+from dupes import find_duplicates
+from extract import extract_files
+from fileio import VolumeFile, read_extents
+import instrument
+import lznt1
+from hashing import DEFAULT_ALGORITHMS, compute_hashes
+from search import SearchIndex
+from sniff import sniff_types
+from timeline import export_timeline
+from usage import UsageTable
+
+# Số đơn vị nén (mặc định 64 KB mỗi đơn vị) đã giải nén được giữ trong cache
+UNIT_CACHE_SIZE = 64
+# Số bản ghi MFT thô (đã áp fixup) giữ trong cache để đọc dữ liệu resident
+RECORD_CACHE_SIZE = 1024
+# Thư mục giả chứa các bản ghi mất thư mục cha (hoặc nằm trong vòng lặp parent_id)
+ORPHAN_DIR = "$Orphan"
+
 class NTFSAttribute(Flag):
     read_only = 0x0001  # File chỉ đọc
     hidden = 0x0002     # File ẩn
@@ -13,43 +40,131 @@ def as_datetime(timestamp):
   """Chuyển đổi timestamp NTFS (100-ns intervals từ 1601-01-01) sang datetime"""
   return datetime.fromtimestamp((timestamp - 116444736000000000) // 10000000)
 
+def apply_fixups(data: bytes, sector_size: int) -> bytes:
+  """Khôi phục 2 byte cuối mỗi sector của bản ghi từ Update Sequence Array"""
+  if data[:4] != b"FILE":
+    return data
+  usa_offset = int.from_bytes(data[0x4:0x6], byteorder='little')
+  usa_count = int.from_bytes(data[0x6:0x8], byteorder='little')
+  if usa_count < 2 or usa_offset + usa_count * 2 > len(data):
+    return data
+  fixed = bytearray(data)
+  usn = data[usa_offset:usa_offset + 2]
+  for i in range(1, usa_count):
+    end = i * sector_size
+    if end > len(fixed) or fixed[end - 2:end] != usn:
+      break
+    fixed[end - 2:end] = data[usa_offset + i * 2:usa_offset + i * 2 + 2]
+  return bytes(fixed)
+
+def resident_attribute(data: bytes, attr_type: int):
+  """Nội dung thuộc tính resident đầu tiên có kiểu attr_type trong bản ghi MFT thô; None nếu không có"""
+  pos = int.from_bytes(data[0x14:0x16], byteorder='little')
+  while pos + 0x18 <= len(data):
+    current = int.from_bytes(data[pos:pos + 4], byteorder='little')
+    length = int.from_bytes(data[pos + 4:pos + 8], byteorder='little')
+    if current == 0xFFFFFFFF or length == 0:
+      break
+    if current == attr_type and data[pos + 8] == 0:
+      size = int.from_bytes(data[pos + 0x10:pos + 0x14], byteorder='little')
+      offset = int.from_bytes(data[pos + 0x14:pos + 0x16], byteorder='little')
+      return data[pos + offset:pos + offset + size]
+    pos += length
+  return None
+
 class Record:
   """Lớp đại diện cho một bản ghi MFT (Master File Table)"""
-  def __init__(self, data) -> None:
+  stream_name = ""  # Stream chính (không tên); xem Stream cho các ADS
+  def __init__(self, data, allow_deleted=False) -> None:
     # Phân tích cấu trúc bản ghi MFT
     self.raw_data = data
     # Lấy ID file từ offset 0x2C-0x30
     self.file_id = int.from_bytes(self.raw_data[0x2C:0x30], byteorder='little')
+    # Số thứ tự (sequence) tại offset 0x10: tăng mỗi khi bản ghi được dùng lại cho file khác
+    self.sequence = int.from_bytes(self.raw_data[0x10:0x12], byteorder='little')
     self.flag = self.raw_data[0x16]
     # Kiểm tra trạng thái bản ghi
-    if self.flag == 0 or self.flag == 2:
+    self.is_deleted = self.flag == 0 or self.flag == 2
+    if self.is_deleted and not allow_deleted:
       # Bản ghi đã xóa
       raise Exception("Skip this record")
     standard_info_start = int.from_bytes(self.raw_data[0x14:0x16], byteorder='little')
-    standard_info_size = int.from_bytes(self.raw_data[standard_info_start + 4:standard_info_start + 8], byteorder='little')
     self.standard_info = {}
     self.parse_standard_info(standard_info_start)  # Phân tích thông tin chuẩn của bản ghi
-    file_name_start = standard_info_start + standard_info_size
-    file_name_size = int.from_bytes(self.raw_data[file_name_start + 4:file_name_start + 8], byteorder='little')
+    # Tên và mọi stream $DATA lấy theo kiểu thuộc tính trong một lượt duyệt: bản ghi có thể có
+    # thêm $FILE_NAME (tên DOS 8.3), $ATTRIBUTE_LIST... nên không giả định vị trí cố định
+    file_name_start, main_data, self.ads, has_index = self.parse_attributes(standard_info_start)
+    if file_name_start is None:
+      raise Exception("Skip this record")
     self.file_name = {}
     self.parse_file_name(file_name_start) # Phân tích tên file của bản ghi
-    data_start = file_name_start + file_name_size
-    data_sig = self.raw_data[data_start:data_start + 4]
-    if data_sig[0] == 64:
-      data_start += int.from_bytes(self.raw_data[data_start + 4:data_start + 8], byteorder='little')
-    
-    data_sig = self.raw_data[data_start:data_start + 4]
-    self.data = {}
-    if data_sig[0] == 128:
-      self.parse_data(data_start) # Phân tích dữ liệu file của bản ghi
-    elif data_sig[0] == 144:
+    if main_data is not None:
+      self.data = main_data
+    elif has_index:
       self.standard_info['flags'] |= NTFSAttribute.directory
-      self.data['size'] = 0
-      self.data['resident'] = True
+      self.data = {'size': 0, 'resident': True}
+    else:
+      self.data = {}
     self.childs: list[Record] = []
 
     del self.raw_data
 
+  @classmethod
+  def restore(cls, row, streams, extents) -> 'Record':
+    """Dựng lại bản ghi từ CSDL đã xuất (export_sqlite.py) thay vì parse bản ghi MFT thô"""
+    record = cls.__new__(cls)
+    record.file_id, parent_id, name, _, _, flags, _, record.flag = row[:8]
+    record.is_deleted = record.flag == 0 or record.flag == 2
+    si, fn = tuple(row[8:12]), tuple(row[12:16])
+    record.sequence = row[16]
+    record.standard_info = {
+      "created_time": as_datetime(si[3]),
+      "last_modified_time": as_datetime(si[0]),
+      "flags": NTFSAttribute(flags),
+      "timestamps": si,
+    }
+    record.file_name = {"parent_id": parent_id, "long_name": name, "timestamps": fn}
+    record.data = {}
+    record.ads = {}
+    for stream_name, (_, _, size, resident, compressed, unit, sparse, content_offset) in streams.items():
+      data = {'resident': bool(resident), 'size': size}
+      if resident:
+        data['content_offset'] = content_offset
+      else:
+        data['compressed'] = bool(compressed)
+        data['sparse'] = bool(sparse)
+        data['compression_unit'] = unit
+        data['runs'] = extents.get(stream_name, [])
+        first_lcn, first_length = data['runs'][0] if data['runs'] else (0, 0)
+        data['cluster_size'] = first_length
+        data['cluster_offset'] = first_lcn or 0
+      if stream_name:
+        record.ads[stream_name] = data
+      else:
+        record.data = data
+    record.childs = []
+    return record
+
+  @classmethod
+  def pseudo_directory(cls, name: str, parent_id) -> 'Record':
+    """Thư mục ảo (không có bản ghi MFT tương ứng), vd. $Orphan"""
+    record = cls.__new__(cls)
+    record.file_id = -1
+    record.sequence = 0
+    record.flag = 3
+    record.is_deleted = False
+    record.standard_info = {
+      "created_time": None,
+      "last_modified_time": None,
+      "flags": NTFSAttribute.directory,
+      "timestamps": (0, 0, 0, 0),
+    }
+    record.file_name = {"parent_id": parent_id, "long_name": name, "timestamps": (0, 0, 0, 0)}
+    record.data = {'size': 0, 'resident': True}
+    record.ads = {}
+    record.childs = []
+    return record
+
   def get_attributes(self):
     # Lấy tất cả các thuộc tính từ flags
     return [attr.name for attr in NTFSAttribute if attr in self.standard_info['flags']]
@@ -67,6 +182,16 @@ class Record:
       return False
     return True
   
+  def is_metafile(self) -> bool:
+    # Bản ghi 0..23 dành cho metafile ($MFT, $Bitmap...); metafile con của $Extend (11) chỉ tới được qua $Extend
+    return 0 <= self.file_id < 24
+
+  def get_records(self, include_hidden=False) -> 'list[Record]':
+    """Bản ghi con; include_hidden=True: gồm cả bản ghi hidden/system của người dùng (trừ metafile)"""
+    if not include_hidden:
+      return self.get_active_records()
+    return [record for record in self.childs if record.is_active_record() or not record.is_metafile()]
+
   def find_record(self, name: str):
     for record in self.childs:
       if record.file_name['long_name'] == name:
@@ -89,23 +214,7 @@ class Record:
     
     # Xử lý thuộc tính DATA (0x80)
     if attr_type == b'\x80\x00\x00\x00':
-        self.data['resident'] = not bool(self.raw_data[start + 0x8])  # 0x8 = Resident flag
-        
-        # Resident Data
-        if self.data['resident']:
-            offset = int.from_bytes(self.raw_data[start + 0x14:start + 0x16], byteorder='little')
-            self.data['size'] = int.from_bytes(self.raw_data[start + 0x10:start + 0x14], byteorder='little')
-            self.data['content'] = self.raw_data[start + offset:start + offset + self.data['size']] # Lấy dữ liệu trực tiếp từ MFT
-        
-        # Non-Resident Data
-        else:
-            cluster_chain = self.raw_data[start + 0x40]
-            offset_bits = (cluster_chain & 0xF0) >> 4
-            size_bits = cluster_chain & 0x0F
-            
-            self.data['size'] = int.from_bytes(self.raw_data[start + 0x30:start + 0x38], byteorder='little')
-            self.data['cluster_size'] = int.from_bytes(self.raw_data[start + 0x41:start + 0x41 + size_bits], byteorder='little')
-            self.data['cluster_offset'] = int.from_bytes(self.raw_data[start + 0x41 + size_bits:start + 0x41 + size_bits + offset_bits], byteorder='little')
+        self.data.update(self.parse_data_attribute(start))
     
     # Xử lý thư mục (Directory, 0x90)
     elif attr_type == b'\x90\x00\x00\x00':
@@ -117,6 +226,99 @@ class Record:
         pass  # Hoặc xử lý tùy theo logic
 
 
+  def parse_data_attribute(self, start) -> dict:
+    """Phân tích một thuộc tính $DATA (resident hoặc non-resident) tại start"""
+    data = {}
+    data['resident'] = not bool(self.raw_data[start + 0x8])  # 0x8 = Resident flag
+
+    # Resident Data
+    if data['resident']:
+      offset = int.from_bytes(self.raw_data[start + 0x14:start + 0x16], byteorder='little')
+      data['size'] = int.from_bytes(self.raw_data[start + 0x10:start + 0x14], byteorder='little')
+      # Chỉ ghi vị trí dữ liệu trong bản ghi; nội dung được đọc lại từ MFT khi cần (NTFS.resident_content)
+      data['content_offset'] = start + offset
+
+    # Non-Resident Data
+    else:
+      data['size'] = int.from_bytes(self.raw_data[start + 0x30:start + 0x38], byteorder='little')
+      # Cờ thuộc tính (0x0C): 0x0001 nén, 0x8000 sparse; 0x22: log2 số cluster mỗi đơn vị nén
+      attr_flags = int.from_bytes(self.raw_data[start + 0x0C:start + 0x0E], byteorder='little')
+      unit = self.raw_data[start + 0x22]
+      data['compressed'] = bool(attr_flags & 0x0001) and unit > 0
+      data['sparse'] = bool(attr_flags & 0x8000)
+      data['compression_unit'] = 1 << unit if data['compressed'] else 0
+      run_offset = int.from_bytes(self.raw_data[start + 0x20:start + 0x22], byteorder='little')
+      data['runs'] = self.parse_data_runs(start + run_offset)
+      first_lcn, first_length = data['runs'][0] if data['runs'] else (0, 0)
+      data['cluster_size'] = first_length
+      data['cluster_offset'] = first_lcn or 0
+    return data
+
+  def parse_attributes(self, start) -> 'tuple[int, dict, dict[str, dict], bool]':
+    """Duyệt mọi thuộc tính của bản ghi theo kiểu (không dựa vào thứ tự hay vị trí).
+
+    Trả về (vị trí $FILE_NAME dùng làm tên, $DATA không tên, các $DATA có tên theo tên stream,
+    có $INDEX_ROOT hay không). Tên DOS 8.3 chỉ được dùng khi không có $FILE_NAME nào khác.
+    """
+    file_name = dos_name = None
+    main = None
+    streams = {}
+    has_index = False
+    pos = start
+    while pos + 0x10 <= len(self.raw_data):
+      attr_type = int.from_bytes(self.raw_data[pos:pos + 4], byteorder='little')
+      length = int.from_bytes(self.raw_data[pos + 4:pos + 8], byteorder='little')
+      if attr_type == 0xFFFFFFFF or length == 0:
+        break
+      if attr_type == 0x30:
+        offset = int.from_bytes(self.raw_data[pos + 0x14:pos + 0x16], byteorder='little')
+        if self.raw_data[pos + offset + 65] == 2:  # Namespace DOS
+          dos_name = pos if dos_name is None else dos_name
+        elif file_name is None:
+          file_name = pos
+      elif attr_type == 0x80:
+        name_length = self.raw_data[pos + 9]
+        if name_length:
+          name_offset = int.from_bytes(self.raw_data[pos + 0xA:pos + 0xC], byteorder='little')
+          name = self.raw_data[pos + name_offset:pos + name_offset + 2 * name_length].decode('utf-16le', errors='replace')
+          streams[name] = self.parse_data_attribute(pos)
+        elif main is None:
+          main = self.parse_data_attribute(pos)
+      elif attr_type == 0x90:
+        has_index = True
+      pos += length
+    return file_name if file_name is not None else dos_name, main, streams, has_index
+
+  def get_streams(self) -> 'list[dict]':
+    """Mọi stream $DATA của bản ghi: stream chính (tên rỗng) rồi tới các ADS"""
+    streams = [("", self.data)] if not self.is_directory() else []
+    streams += list(self.ads.items())
+    return [{
+      "Name": name,
+      "Size": data.get('size', 0),
+      "Resident": data.get('resident', True),
+      "Compressed": data.get('compressed', False),
+      "Extents": [] if data.get('resident', True) else list(data.get('runs', [])),
+    } for name, data in streams]
+
+  def parse_data_runs(self, pos):
+    """Giải mã danh sách data run thành [(LCN, số cluster)], LCN = None với run sparse"""
+    runs = []
+    lcn = 0
+    while pos < len(self.raw_data) and self.raw_data[pos] != 0:
+      header = self.raw_data[pos]
+      size_bits = header & 0x0F
+      offset_bits = (header & 0xF0) >> 4
+      length = int.from_bytes(self.raw_data[pos + 1:pos + 1 + size_bits], byteorder='little')
+      if offset_bits:
+        # Offset của mỗi run là tương đối (có dấu) so với run trước
+        lcn += int.from_bytes(self.raw_data[pos + 1 + size_bits:pos + 1 + size_bits + offset_bits], byteorder='little', signed=True)
+        runs.append((lcn, length))
+      else:
+        runs.append((None, length))
+      pos += 1 + size_bits + offset_bits
+    return runs
+
   def parse_file_name(self, start):
     sig = int.from_bytes(self.raw_data[start:start + 4], byteorder='little')
     if sig != 0x30:
@@ -128,6 +330,9 @@ class Record:
     body = self.raw_data[start + offset: start + offset + size]
     
     self.file_name["parent_id"] = int.from_bytes(body[:6], byteorder='little')
+    # FILETIME thô của $FILE_NAME theo thứ tự (M, A, C, B): sửa đổi, truy cập, thay đổi MFT, tạo
+    created, modified, changed, accessed = (int.from_bytes(body[i:i + 8], byteorder='little') for i in range(8, 40, 8))
+    self.file_name["timestamps"] = (modified, accessed, changed, created)
     name_length = body[64]
     self.file_name["long_name"] = self.decode_filename(body[66:66 + name_length * 2])  # unicode
 
@@ -144,6 +349,9 @@ class Record:
     self.standard_info["last_modified_time"] = as_datetime(int.from_bytes(self.raw_data[begin + 8:begin + 16], byteorder='little'))
     self.standard_info["flags"] = NTFSAttribute(int.from_bytes(self.raw_data[begin + 32:begin + 36], byteorder='little'))
     self.standard_info["created_time"] = as_datetime(int.from_bytes(self.raw_data[begin:begin+8], byteorder='little'))
+    # FILETIME thô theo thứ tự (M, A, C, B) cho timeline
+    created, modified, changed, accessed = (int.from_bytes(self.raw_data[begin + i:begin + i + 8], byteorder='little') for i in range(0, 32, 8))
+    self.standard_info["timestamps"] = (modified, accessed, changed, created)
     
     self.parse_flags(begin + 32)
 
@@ -155,6 +363,36 @@ class Record:
           self.standard_info["flags"] &= ~NTFSAttribute.device
 
 
+def parse_mft_chunk(device, offset, record_size, sector_size, count) -> 'list[Record]':
+  """Đọc và parse count bản ghi MFT liên tiếp tại offset của thiết bị (chạy trong process con)"""
+  with open(device, 'rb') as f:
+    f.seek(offset)
+    chunk = f.read(count * record_size)
+  records = []
+  for i in range(len(chunk) // record_size):
+    dat = apply_fixups(chunk[i * record_size:(i + 1) * record_size], sector_size)
+    if dat[:4] == b"FILE":
+      try:
+        records.append(Record(dat))
+      except Exception:
+        pass
+  return records
+
+
+class Stream:
+  """Một stream $DATA có tên (ADS) của bản ghi, đọc được như bản ghi thường (read_range, open_file...)"""
+  def __init__(self, record: Record, name: str) -> None:
+    self.record = record
+    self.file_id = record.file_id
+    self.stream_name = name
+    self.data = record.ads[name]
+    self.standard_info = record.standard_info
+    self.file_name = record.file_name
+
+  def is_directory(self):
+    return False
+
+
 class DirectoryTree:
   """Lớp quản lý cấu trúc cây thư mục NTFS"""
   def __init__(self, nodes: 'list[Record]') -> None:
@@ -165,6 +403,13 @@ class DirectoryTree:
 
     self.link_parent_child_nodes()
     self.find_root_node()
+    # Đường dẫn đầy đủ của mọi thư mục (memo theo số bản ghi); đường dẫn file = thư mục cha + tên
+    self.dir_paths: dict[int, str] = {}
+    self.cycle_breaks: list[Record] = []
+    self.orphan = None
+    if self.root is not None:
+      self.dir_paths[self.root.file_id] = ""
+      self.link_orphans()
 
   def link_parent_child_nodes(self):
     """Xây dựng quan hệ parent-child giữa các bản ghi"""
@@ -181,6 +426,67 @@ class DirectoryTree:
     
     self.current_dir = self.root
 
+  def directory_path(self, file_id) -> str:
+    """Đường dẫn đầy đủ của thư mục file_id, tính một lần cho mỗi thư mục tổ tiên.
+
+    Lần theo parent_id tới thư mục đã biết đường dẫn rồi ghi nhớ đường dẫn của mọi
+    thư mục trên đoạn vừa đi. Chuỗi cha bị đứt (bản ghi cha không còn) hoặc quay vòng
+    được gắn vào thư mục giả $Orphan.
+    """
+    path = self.dir_paths.get(file_id)
+    if path is not None:
+      return path
+    chain: list[Record] = []
+    on_chain = set()
+    current = file_id
+    while True:
+      path = self.dir_paths.get(current)
+      if path is not None:
+        break
+      node = self.nodes_dict.get(current)
+      if node is None:
+        path = ORPHAN_DIR  # Thư mục cha không còn trong MFT
+        break
+      if current in on_chain:
+        # Vòng lặp parent_id: cắt tại bản ghi cuối đoạn, đưa nó về $Orphan
+        self.cycle_breaks.append(chain[-1])
+        path = ORPHAN_DIR
+        break
+      chain.append(node)
+      on_chain.add(current)
+      current = node.file_name['parent_id']
+    for node in reversed(chain):
+      path = f"{path}\\{node.file_name['long_name']}" if path else node.file_name['long_name']
+      self.dir_paths[node.file_id] = path
+    return self.dir_paths.get(file_id, ORPHAN_DIR)
+
+  def path_of(self, record: Record) -> str:
+    """Đường dẫn đầy đủ (tính từ gốc) của bản ghi; cả bản ghi không nằm trong cây (vd. đã xóa)"""
+    if self.nodes_dict.get(record.file_id) is record and record.file_id in self.dir_paths:
+      return self.dir_paths[record.file_id]
+    parent = self.directory_path(record.file_name['parent_id'])
+    return f"{parent}\\{record.file_name['long_name']}" if parent else record.file_name['long_name']
+
+  def link_orphans(self):
+    """Tính đường dẫn mọi thư mục trong một lượt; bản ghi mất cha hoặc thuộc vòng lặp
+    được gắn vào thư mục giả $Orphan dưới thư mục gốc để vẫn duyệt được từ gốc"""
+    orphans = []
+    for node in self.nodes_dict.values():
+      if node is self.root:
+        continue
+      parent_id = node.file_name['parent_id']
+      if parent_id not in self.nodes_dict:
+        orphans.append(node)
+      else:
+        self.directory_path(parent_id)
+    for node in self.cycle_breaks:
+      self.nodes_dict[node.file_name['parent_id']].childs.remove(node)
+      orphans.append(node)
+    if orphans:
+      self.orphan = Record.pseudo_directory(ORPHAN_DIR, self.root.file_id)
+      self.orphan.childs = orphans
+      self.root.childs.append(self.orphan)
+
   def find_record(self, name: str):
     # Chuẩn hóa tên file (bỏ ký tự đặc biệt và phân biệt hoa thường)
         normalized_name = name.strip().lower()
@@ -220,12 +526,31 @@ class NTFS:
     "first_cluster_of_MFTMirr",
     "record_size",
   ]
-  def __init__(self, name: str) -> None:
-    """Khởi tạo và đọc thông tin volume NTFS"""
+  def __init__(self, name: str, device=None, workers=None, cache=None) -> None:
+    """Khởi tạo và đọc thông tin volume NTFS.
+
+    device: thiết bị đã mở sẵn (vd. PartitionView của một phân vùng trên ảnh đĩa, xem partition.py)
+    workers: số process dùng để parse MFT song song (None: tuần tự)
+    cache: CSDL SQLite do export_sqlite() tạo; nếu khớp volume thì nạp bản ghi từ đó thay vì quét MFT
+    """
     self.name = name
     self.cwd = [self.name]
+    self.search_index = None
+    self.usage = None
+    self.bitmap = None
+    self.unit_cache: OrderedDict[tuple, bytes] = OrderedDict()
+    self.record_cache: OrderedDict[int, bytes] = OrderedDict()
+    # Kết quả sniff_types() theo (đường dẫn, kích thước, cluster đầu)
+    self.sniff_cache = {}
+    # Bảo vệ các cache dựng lười (bitmap, index tìm kiếm, bảng dung lượng) khi nhiều thread dùng chung volume
+    self.cache_lock = threading.RLock()
     try:
-      self.fd = open(r'\\.\%s' % self.name, 'rb') # Mở volume ở chế độ đọc binary
+      if device is None:
+        self.fd = instrument.wrap(open(device_path(self.name), 'rb')) # Mở volume ở chế độ đọc binary
+        self.dev = BlockDevice(self.fd)
+      else:
+        self.fd = None
+        self.dev = device
     except FileNotFoundError:
       print(f"[ERROR] No volume named {name}")
       exit()
@@ -238,9 +563,10 @@ class NTFS:
       exit()
 
     try:
-      self.boot_sector_raw = self.fd.read(0x200)  # Đọc boot sector (512 byte đầu tiên)
-      self.boot_sector = {}
-      self.parse_boot_sector()
+      with instrument.phase("boot_sector"):
+        self.boot_sector_raw = self.dev.read_at(0, 0x200)  # Đọc boot sector (512 byte đầu tiên)
+        self.boot_sector = {}
+        self.parse_boot_sector()
       # Kiểm tra OEM_ID để xác định đúng NTFS
       if self.boot_sector["OEM_ID"] != b'NTFS    ':
         raise Exception("Not NTFS")
@@ -253,34 +579,113 @@ class NTFS:
 
       self.record_size = self.boot_sector["record_size"]
       self.mft_offset = self.boot_sector['first_cluster_of_MFT']
-      self.fd.seek(self.mft_offset * self.SC * self.BS)
-      self.mft_file = File(self.fd.read(self.record_size))
-      mft_record: list[Record] = []
-      for _ in range(2, self.mft_file.num_sector, 2):
-        dat = self.fd.read(self.record_size)
+      self.mft_file = File(apply_fixups(self.dev.read_at(self.mft_offset * self.SC * self.BS, self.record_size), self.BS))
+      mft_record = self.load_cache(cache) if cache else None
+      if mft_record is None:
+        with instrument.phase("mft_scan"):
+          mft_record = self.scan_mft(workers)
+  
+      with instrument.phase("tree_link"):
+        self.dir_tree = DirectoryTree(mft_record)
+
+      self.volume_info = self.read_volume_info()
+      self.label = self.volume_info["label"]
+      # NTFS không lưu sẵn số cluster trống: chỉ đếm bit trên $Bitmap khi được yêu cầu (start_verification)
+      self.verified_free = None
+      self.stats_thread = None
+    except Exception as e:
+      print(f"[ERROR] {e}")
+      exit()
+
+  def scan_mft(self, workers=None) -> 'list[Record]':
+    """Parse toàn bộ bản ghi MFT; workers > 1 chia vùng MFT thành các đoạn cho process pool"""
+    mft_record: list[Record] = []
+    if not workers or workers < 2:
+      for _, dat in self.iter_mft_raw():
         if dat[:4] == b"FILE":
           try:
             mft_record.append(Record(dat))
           except Exception as e:
             pass
-  
-      self.dir_tree = DirectoryTree(mft_record)
-    except Exception as e:
-      print(f"[ERROR] {e}")
-      exit()
+      return mft_record
+    count = len(range(0, self.mft_file.num_sector, 2))
+    base = getattr(self.dev, "base", 0) + self.mft_offset * self.SC * self.BS
+    step = max(1024, -(-count // (workers * 4)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+      futures = [pool.submit(parse_mft_chunk, self.dev.fd.name, base + first * self.record_size,
+                             self.record_size, self.BS, min(step, count - first))
+                 for first in range(1, count, step)]
+      for future in futures:
+        mft_record.extend(future.result())
+    return mft_record
+
+  def volume_meta(self) -> dict:
+    """Thông số nhận dạng volume, dùng để kiểm tra cache SQLite còn khớp không"""
+    device = self.dev.fd.name
+    return {
+      "File system": "NTFS",
+      "Serial": self.boot_sector['serial_number'],
+      "Volume size": self.boot_sector['volume_size'],
+      "MFT cluster": self.mft_offset,
+      "MFT sectors": self.mft_file.num_sector,
+      "Record size": self.record_size,
+      "Offset": getattr(self.dev, "base", 0),
+      # Ảnh đĩa: thời điểm sửa file ảnh; volume thô không có nên chỉ dựa vào các thông số trên
+      "Device mtime": os.stat(device).st_mtime_ns if os.path.isfile(device) else None,
+    }
+
+  def load_cache(self, db_path) -> 'list[Record]':
+    con = open_cache(db_path, self)
+    if con is None:
+      return None
+    try:
+      return [Record.restore(row, streams, extents) for row, streams, extents in iter_cached_entries(con)]
+    finally:
+      con.close()
+
+  def sqlite_rows(self):
+    """(dòng entry, các dòng stream, các dòng extent) của mọi bản ghi cho export_sqlite()"""
+    for record in self.dir_tree.nodes_dict.values():
+      row = (record.file_id, record.file_name['parent_id'], record.file_name['long_name'], self.record_path(record),
+             record.data.get('size', 0), record.standard_info['flags'].value, int(record.is_directory()), record.flag,
+             *record.standard_info['timestamps'], *record.file_name['timestamps'], record.sequence)
+      streams = []
+      extents = []
+      for name, data in ([("", record.data)] if record.data else []) + list(record.ads.items()):
+        streams.append((name, data.get('size', 0), int(data.get('resident', True)), int(data.get('compressed', False)),
+                        data.get('compression_unit', 0), int(data.get('sparse', False)), data.get('content_offset')))
+        for seq, (lcn, count) in enumerate(data.get('runs', [])):
+          extents.append((name, seq, lcn, count))
+      yield row, streams, extents
+
+  def export_sqlite(self, db_path: str) -> dict:
+    """Xuất metadata mọi bản ghi ra SQLite (xem export_sqlite.py)"""
+    return export_sqlite(self, db_path)
+
+  def iter_mft_raw(self, batch=256):
+    """Đọc tuần tự vùng MFT theo lô, sinh (số bản ghi, dữ liệu thô) từ bản ghi 1"""
+    count = len(range(0, self.mft_file.num_sector, 2))
+    base = self.mft_offset * self.SC * self.BS
+    for first in range(1, count, batch):
+      n = min(batch, count - first)
+      chunk = self.dev.read_at(base + first * self.record_size, n * self.record_size)
+      for i in range(n):
+        yield first + i, apply_fixups(chunk[i * self.record_size:(i + 1) * self.record_size], self.BS)
 
   @staticmethod
   def is_ntfs(name: str):
     try:
-      with open(r'\\.\%s' % name, 'rb') as fd:
-        oem_id = fd.read(0xB)[3:]
-        if oem_id == b'NTFS    ':
-          return True
-        return False
+      with open(device_path(name), 'rb') as fd:
+        return NTFS.is_ntfs_boot(fd.read(0x200))
     except Exception as e:
       print(f"[ERROR] {e}")
       exit()
 
+  @staticmethod
+  def is_ntfs_boot(boot_sector: bytes) -> bool:
+    """Nhận dạng NTFS từ boot sector đã đọc (không mở lại thiết bị)"""
+    return boot_sector[3:0xB] == b'NTFS    '
+
   def parse_boot_sector(self):
     """Trích xuất thông tin từ boot sector NTFS"""
     self.boot_sector.update(self.get_boot_para())
@@ -337,24 +742,401 @@ class NTFS:
         record_list = next_dir.get_active_records()
       else:
         record_list = self.dir_tree.get_active_records()   # Trả về danh sách các bản ghi hợp lệ
-      ret = []
       # Bao gồm: tên, kích thước, thuộc tính...
-      for record in record_list:
-        obj = {}
-        obj["Flags"] = record.standard_info['flags'].value
-        obj["Date Modified"] = record.standard_info['last_modified_time']
-        obj["Size"] = record.data.get('size', 0)
-        obj["Name"] = record.file_name['long_name']
-        obj["Sector"] = (
-                self.mft_offset * self.SC + record.file_id
-                if record.data.get('resident', False)
-                else record.data.get('cluster_offset', 0) * self.SC
-            )
-        ret.append(obj)
-      return ret
+      return [self.entry_info(record) for record in record_list]
     except Exception as e:
       raise (e)
 
+  def entry_info(self, record: Record) -> dict:
+    obj = {}
+    obj["Flags"] = record.standard_info['flags'].value
+    obj["Date Modified"] = record.standard_info['last_modified_time']
+    obj["Size"] = record.data.get('size', 0)
+    obj["Name"] = record.file_name['long_name']
+    obj["Sector"] = (
+            self.mft_offset * self.SC + record.file_id
+            if record.data.get('resident', False)
+            else record.data.get('cluster_offset', 0) * self.SC
+        )
+    return obj
+
+  def walk(self, path="", from_root=False, include_hidden=False):
+    """Duyệt đệ quy (DFS) cây con, trả về info kèm "Path" và "Node".
+    from_root=True: duyệt cả volume từ thư mục gốc, không phụ thuộc cwd
+    include_hidden=True: gồm cả bản ghi hidden/system của người dùng, trừ metafile (băm/quét toàn bộ ảnh)"""
+    if from_root:
+      prefix, start = "", self.dir_tree.root
+    else:
+      prefix = "\\".join(self.parse_path(path)) if path else ""
+      start = self.open_directory(path) if path else self.dir_tree.current_dir
+    stack = [(prefix, start)]
+    visited = {start.file_id}
+    while stack:
+      prefix, cur_dir = stack.pop()
+      for record in cur_dir.get_records(include_hidden):
+        info = self.entry_info(record)
+        info["Path"] = f"{prefix}\\{info['Name']}" if prefix else info["Name"]
+        info["Node"] = record
+        yield info
+        if record.is_directory() and record.file_id not in visited:
+          visited.add(record.file_id)
+          stack.append((info["Path"], record))
+
+  def cluster_count(self) -> int:
+    return self.boot_sector['volume_size'] // self.SC
+
+  def load_bitmap(self) -> bytes:
+    """Đọc bitmap cấp phát cluster từ $Bitmap (bản ghi MFT số 6)"""
+    if self.bitmap is None:
+      record = self.dir_tree.nodes_dict.get(6)
+      if record is None:
+        raise Exception("$Bitmap record not found")
+      with self.cache_lock:
+        if self.bitmap is None:
+          if record.data.get('resident', True) or record.data.get('compressed'):
+            self.bitmap = self.read_file_bytes(record)
+          else:
+            # Đọc thẳng từ thiết bị: bitmap lớn không được đẩy metadata MFT ra khỏi cache block
+            self.bitmap = read_extents(self, self.get_extents(record), 0, record.data.get('size', 0), uncached=True)
+    return self.bitmap
+
+  def cluster_range(self) -> 'tuple[int, int]':
+    return 0, self.cluster_count()
+
+  def cluster_byte_offset(self, index) -> int:
+    return index * self.SC * self.BS
+
+  def read_volume_info(self) -> dict:
+    """Nhãn ($VOLUME_NAME), phiên bản và cờ ($VOLUME_INFORMATION) từ bản ghi $Volume (số 3)"""
+    raw = apply_fixups(self.dev.read_at(self.mft_offset * self.SC * self.BS + 3 * self.record_size, self.record_size), self.BS)
+    name = resident_attribute(raw, 0x60) or b""
+    info = resident_attribute(raw, 0x70) or b""
+    flags = int.from_bytes(info[0xA:0xC], byteorder='little') if len(info) >= 0xC else 0
+    return {
+      "label": name.decode('utf-16le', errors='replace'),
+      "version": f"{info[8]}.{info[9]}" if len(info) >= 0xA else None,
+      "dirty": bool(flags & 0x0001),
+    }
+
+  def verify_free_clusters(self):
+    """Đếm số cluster trống trên $Bitmap (chạy nền, xem start_verification)"""
+    try:
+      total = self.cluster_count()
+      self.verified_free = total - count_set_bits(self.load_bitmap(), 0, total)
+    except Exception:
+      pass  # Không đọc được $Bitmap: số trống để trống (None)
+
+  def start_verification(self) -> threading.Thread:
+    """Bắt đầu đếm số cluster trống trên $Bitmap ở thread nền (một lần cho mỗi volume); trả về thread"""
+    with self.cache_lock:
+      if self.stats_thread is None:
+        self.stats_thread = threading.Thread(target=self.verify_free_clusters, daemon=True)
+        self.stats_thread.start()
+    return self.stats_thread
+
+  def volume_stats(self, verify=False) -> dict:
+    """Dung lượng tổng/trống/đã dùng, nhãn và số bản ghi, không cần duyệt cây thư mục.
+
+    Tổng lấy từ boot sector; số trống có sau khi $Bitmap được đếm (start_verification(),
+    hoặc verify=True: đếm và chờ kết quả), trước đó là None.
+    """
+    if verify:
+      self.start_verification().join()
+    stats = space_stats(self.cluster_count(), self.verified_free, self.SC * self.BS)
+    stats.update({
+      "Label": self.label,
+      "Free source": "$Bitmap" if self.verified_free is not None else None,
+      "NTFS version": self.volume_info["version"],
+      "Dirty": self.volume_info["dirty"],
+      "Records": len(self.dir_tree.nodes_dict),
+    })
+    return stats
+
+  def allocation_map(self) -> dict:
+    """Bản đồ cluster trống/đã dùng (dạng run-length) từ $Bitmap"""
+    first, end = self.cluster_range()
+    return allocation_map(bitmap_free_runs(self.load_bitmap(), end), first, end)
+
+  def carve(self, free_only=False, types=None, max_workers=None, aligned=True):
+    """Khôi phục file theo chữ ký trên toàn bộ cluster (xem carve.py)"""
+    return carve(self, free_only, types, max_workers, aligned)
+
+  def fragmentation(self, top=10) -> dict:
+    return fragmentation_stats(self, top)
+
+  def record_path(self, record: Record) -> str:
+    """Đường dẫn đầy đủ (tính từ gốc) của bản ghi; bản ghi mất thư mục cha nằm dưới $Orphan"""
+    return self.dir_tree.path_of(record)
+
+  def timeline_entries(self):
+    """(đường dẫn, kích thước, số bản ghi, nguồn, mốc (M, A, C, B) dạng FILETIME) của mọi bản ghi,
+    lấy cả $STANDARD_INFORMATION ("SI") và $FILE_NAME ("FN")"""
+    for record in self.dir_tree.nodes_dict.values():
+      path = self.record_path(record)
+      size = record.data.get('size', 0)
+      yield path, size, record.file_id, "SI", record.standard_info['timestamps']
+      yield path, size, record.file_id, "FN", record.file_name['timestamps']
+
+  def diff_entries(self):
+    """(khóa, đường dẫn, thư mục?, kích thước, mtime FILETIME, extent, bản ghi) cho diff.py;
+    khóa là (số bản ghi MFT, sequence) nên file bị đổi tên/di chuyển vẫn khớp được"""
+    for info in self.walk(from_root=True):
+      record = info["Node"]
+      yield ((record.file_id, record.sequence), info["Path"], record.is_directory(), info["Size"],
+             record.standard_info['timestamps'][0], tuple(self.get_extents(record)), record)
+
+  def timeline(self, out_path: str, fmt="csv") -> dict:
+    """Xuất timeline MAC đã sắp xếp (CSV) hoặc body file (xem timeline.py)"""
+    return export_timeline(self, out_path, fmt)
+
+  def scan_deleted(self):
+    """Quét toàn bộ MFT trong 1 lượt, sinh thông tin các bản ghi đã xóa (dạng generator)"""
+    bitmap = self.load_bitmap()
+    for number, dat in self.iter_mft_raw():
+      if dat[:4] != b"FILE" or dat[0x16] not in (0, 2):
+        continue
+      try:
+        record = Record(dat, allow_deleted=True)
+      except Exception:
+        continue
+      extents = self.get_extents(record)
+      # Bit đã bật trong $Bitmap nghĩa là cluster đã được cấp phát lại
+      overwritten = sum(count_set_bits(bitmap, lcn, count) for lcn, count in extents if lcn is not None)
+      info = self.entry_info(record)
+      info.update({
+        "Path": self.record_path(record),
+        "Record": number,
+        "Extents": extents,
+        "Overwritten clusters": overwritten,
+        "Recoverable": overwritten == 0,
+        "Node": record,
+      })
+      yield info
+
+  def usage_nodes(self):
+    """Sinh (key, parent_key, path, size, clusters, is_dir) theo thứ tự tiền tự cho UsageTable"""
+    root = self.dir_tree.root
+    yield root.file_id, None, "", 0, 0, True
+    stack = [(root, "")]
+    visited = {root.file_id}
+    while stack:
+      cur_dir, prefix = stack.pop()
+      for record in cur_dir.childs:
+        if record.is_directory() and record.file_id in visited:
+          continue  # Thư mục gốc là con của chính nó
+        path = f"{prefix}\\{record.file_name['long_name']}" if prefix else record.file_name['long_name']
+        if record.is_directory():
+          visited.add(record.file_id)
+          yield record.file_id, cur_dir.file_id, path, 0, 0, True
+          stack.append((record, path))
+        else:
+          clusters = sum(count for lcn, count in self.get_extents(record) if lcn is not None)
+          yield record.file_id, cur_dir.file_id, path, record.data.get('size', 0), clusters, False
+
+  def du(self, path="") -> dict:
+    """Tổng dung lượng đệ quy của thư mục (đường dẫn tính từ gốc volume)"""
+    if self.usage is None:
+      with self.cache_lock:
+        if self.usage is None:
+          self.usage = UsageTable(self)
+    return self.usage.du("\\".join(self.parse_path(path)))
+
+  def top_subtrees(self, n=10) -> 'list[dict]':
+    """n thư mục con chiếm nhiều dung lượng nhất"""
+    if self.usage is None:
+      with self.cache_lock:
+        if self.usage is None:
+          self.usage = UsageTable(self)
+    return self.usage.largest(n)
+
+  def find(self, pattern, size_range=None, mtime_range=None, attrs=None):
+    """Tìm kiếm theo tên/kích thước/thời gian trên index dựng sẵn (xem search.py)"""
+    if self.search_index is None:
+      with self.cache_lock:
+        if self.search_index is None:
+          self.search_index = SearchIndex(self)
+    return self.search_index.find(pattern, size_range, mtime_range, attrs)
+
+  def lookup(self, path: str):
+    """Trả về bản ghi (file hoặc thư mục) theo đường dẫn, None nếu không có"""
+    path = self.parse_path(path)
+    if len(path) > 1:
+      try:
+        next_dir = self.open_directory("\\".join(path[:-1]))
+      except Exception:
+        return None
+      return next_dir.find_record(path[-1])
+    return self.dir_tree.find_record(path[0])
+
+  def get_extents(self, record: Record) -> 'list[tuple[int, int]]':
+    """Danh sách data run (LCN, số cluster) của file; rỗng với dữ liệu resident"""
+    if record.data.get('resident', True):
+      return []
+    return list(record.data.get('runs', []))
+
+  def iter_file_content(self, record: Record, chunk_size=1 << 20):
+    """Đọc tuần tự nội dung nhị phân theo từng data run, mỗi lần tối đa chunk_size byte"""
+    if record.data.get('resident', True):
+      content = self.resident_content(record)
+      if content:
+        yield content
+      return
+    if record.data.get('compressed'):
+      size = record.data.get('size', 0)
+      unit_bytes = record.data['compression_unit'] * self.SC * self.BS
+      for index in range(-(-size // unit_bytes)):
+        yield self.read_compression_unit(record, index)[:size - index * unit_bytes]
+      return
+    cluster_bytes = self.SC * self.BS
+    remaining = record.data.get('size', 0)
+    for lcn, count in self.get_extents(record):
+      length = min(count * cluster_bytes, remaining)
+      remaining -= length
+      offset = (lcn or 0) * cluster_bytes
+      while length > 0:
+        read_size = min(chunk_size, length)
+        if lcn is None:
+          # Run sparse: không có dữ liệu trên đĩa
+          yield bytes(read_size)
+        else:
+          yield self.dev.read_at(offset, read_size)
+        offset += read_size
+        length -= read_size
+
+  def read_record(self, number) -> bytes:
+    """Bản ghi MFT thô (đã áp fixup) theo số bản ghi, có cache LRU"""
+    with self.cache_lock:
+      raw = self.record_cache.get(number)
+      if raw is not None:
+        self.record_cache.move_to_end(number)
+        return raw
+    offset = self.mft_offset * self.SC * self.BS + number * self.record_size
+    raw = apply_fixups(self.dev.read_at(offset, self.record_size), self.BS)
+    with self.cache_lock:
+      self.record_cache[number] = raw
+      if len(self.record_cache) > RECORD_CACHE_SIZE:
+        self.record_cache.popitem(last=False)
+    return raw
+
+  def resident_content(self, record: Record) -> bytes:
+    """Dữ liệu resident của bản ghi (hoặc stream), đọc lại từ bản ghi MFT tại vị trí đã lưu khi parse"""
+    offset = record.data.get('content_offset')
+    if offset is None:
+      return b''
+    return self.read_record(record.file_id)[offset:offset + record.data.get('size', 0)]
+
+  def read_file_bytes(self, record: Record) -> bytes:
+    return b"".join(self.iter_file_content(record))
+
+  def read_range(self, record: Record, offset, size, extents=None) -> bytes:
+    """Đọc size byte bắt đầu tại byte offset của file (đọc theo vị trí, không đọc cả file).
+
+    extents: data run đã lấy sẵn (VolumeFile giữ cho cả vòng đời file), dùng với dữ liệu không nén
+    """
+    if record.data.get('resident', True):
+      return self.resident_content(record)[offset:offset + max(0, size)]
+    size = max(0, min(size, record.data.get('size', 0) - offset))
+    if size == 0:
+      return b""
+    if record.data.get('compressed'):
+      unit_bytes = record.data['compression_unit'] * self.SC * self.BS
+      first, last = offset // unit_bytes, (offset + size - 1) // unit_bytes
+      data = b"".join(self.read_compression_unit(record, index) for index in range(first, last + 1))
+      start = offset - first * unit_bytes
+      return data[start:start + size]
+    return read_extents(self, self.get_extents(record) if extents is None else extents, offset, size)
+
+  def compression_unit_runs(self, record: Record, index) -> 'list[tuple[int, int]]':
+    """Các run (LCN, số cluster) nằm trong đơn vị nén thứ index (LCN None = sparse)"""
+    unit = record.data['compression_unit']
+    first, end = index * unit, (index + 1) * unit
+    runs = []
+    vcn = 0
+    for lcn, count in record.data.get('runs', []):
+      lo, hi = max(vcn, first), min(vcn + count, end)
+      if lo < hi:
+        runs.append((None if lcn is None else lcn + lo - vcn, hi - lo))
+      vcn += count
+      if vcn >= end:
+        break
+    return runs
+
+  def read_compression_unit(self, record: Record, index) -> bytes:
+    """Dữ liệu đã giải nén của một đơn vị nén (16 cluster), có cache LRU.
+
+    Đơn vị toàn sparse là toàn byte 0 (không đọc đĩa); đơn vị có cluster thật
+    kèm phần sparse bù là dữ liệu LZNT1; đơn vị đủ cluster thật được lưu không nén.
+    """
+    key = (record.file_id, record.stream_name, index)
+    with self.cache_lock:
+      data = self.unit_cache.get(key)
+      if data is not None:
+        self.unit_cache.move_to_end(key)
+        return data
+    cluster_bytes = self.SC * self.BS
+    unit_bytes = record.data['compression_unit'] * cluster_bytes
+    runs = self.compression_unit_runs(record, index)
+    real = [(lcn * cluster_bytes, count * cluster_bytes) for lcn, count in runs if lcn is not None]
+    if not real:
+      return bytes(unit_bytes)
+    raw = b"".join(self.dev.read_many(real))
+    if any(lcn is None for lcn, _ in runs):
+      data = lznt1.decompress(raw, unit_bytes)
+    else:
+      data = raw
+    with self.cache_lock:
+      self.unit_cache[key] = data
+      if len(self.unit_cache) > UNIT_CACHE_SIZE:
+        self.unit_cache.popitem(last=False)
+    return data
+
+  def open_file(self, path: str) -> VolumeFile:
+    """Mở file dạng file object chỉ đọc, seek được; "path:stream" mở stream có tên (ADS)"""
+    head, sep, name = path.rpartition("\\")
+    name, _, stream = name.partition(":")
+    stream = stream.removesuffix(":$DATA")  # Cú pháp đầy đủ file:stream:$DATA
+    record = self.lookup(head + sep + name)
+    if not record:
+      raise FileNotFoundError("File not found")
+    if stream:
+      if stream not in record.ads:
+        raise FileNotFoundError(f"Stream '{stream}' not found")
+      record = Stream(record, stream)
+    elif record.is_directory():
+      raise IsADirectoryError("Is a directory")
+    return VolumeFile(self, record, record.data.get('size', 0), path)
+
+  def get_streams(self, path: str) -> 'list[dict]':
+    """Mọi stream $DATA (tên, kích thước, resident, extent) của file/thư mục"""
+    record = self.lookup(path)
+    if not record:
+      raise FileNotFoundError("File not found")
+    return record.get_streams()
+
+  def list_ads(self):
+    """Các file có Alternate Data Stream trên toàn volume (từ các bản ghi đã đọc khi quét MFT)"""
+    for record in self.dir_tree.nodes_dict.values():
+      for info in record.get_streams():
+        if info["Name"]:
+          info["Path"] = self.record_path(record)
+          yield info
+
+  def extract(self, path: str, dest_dir: str, max_workers=4) -> dict:
+    """Sao chép nguyên bản file/thư mục ra đĩa (xem extract.py)"""
+    return extract_files(self, path, dest_dir, max_workers)
+
+  def find_duplicates(self, path="", min_size=1, max_workers=4):
+    """Nhóm file trùng nội dung: kích thước -> băm cluster đầu/cuối -> băm toàn bộ (xem dupes.py)"""
+    return find_duplicates(self, path, min_size, max_workers)
+
+  def sniff_types(self, path="", max_workers=4):
+    """Nhận dạng loại file theo nội dung (chữ ký + entropy 4 KB đầu), có cache theo entry (xem sniff.py)"""
+    return sniff_types(self, path, max_workers)
+
+  def hash_files(self, path="", algorithms=DEFAULT_ALGORITHMS, max_workers=4):
+    """Băm nội dung file (nhiều thuật toán, 1 lượt đọc), trả về (manifest, thống kê)"""
+    return compute_hashes(self, path, algorithms, max_workers)
+
   def change_dir(self, path=""):
     """Thay đổi thư mục làm việc hiện tại"""
     if path == "":
@@ -384,15 +1166,8 @@ class NTFS:
 
   def read_text_file(self, path: str) -> str:
     """Đọc nội dung file văn bản"""
-    path = self.parse_path(path)
     try:
-        if len(path) > 1:
-            name = path[-1]
-            path = "\\".join(path[:-1])
-            next_dir = self.open_directory(path)
-            record = next_dir.find_record(name)
-        else:
-            record = self.dir_tree.find_record(path[0])
+        record = self.lookup(path)
 
         if record is None:
             return "[Error] File not found"
@@ -404,7 +1179,7 @@ class NTFS:
 
         # Xử lý file resident
         if record.data['resident']:
-            content = record.data.get('content', b'')
+            content = self.resident_content(record)
             try:
                 return content.decode('utf-8', errors='replace')   # Tự động decode từ binary sang UTF-8 và thay thế ký tự bị lỗi 
             except Exception as e:
@@ -412,33 +1187,21 @@ class NTFS:
         
         # Xử lý file non-resident
         else:
-            data = ""
-            size_left = record.data.get('size', 0)
-            offset = record.data.get('cluster_offset', 0) * self.SC * self.BS
-            cluster_size = record.data.get('cluster_size', 0)
-            
-            self.fd.seek(offset)
-            for _ in range(cluster_size):
-                if size_left <= 0:
-                    break
-                chunk_size = min(self.SC * self.BS, size_left)
-                raw_data = self.fd.read(chunk_size)
-                size_left -= chunk_size
-                try:
-                    decoded_chunk = raw_data.decode('utf-8', errors='replace')
-                    data += decoded_chunk
-                except Exception as e:
-                    data += f"[Decode error at chunk {_}: {str(e)}]"
-            return data
+            try:
+                return self.read_file_bytes(record).decode('utf-8', errors='replace')
+            except Exception as e:
+                return f"[Error] Cannot decode content: {str(e)}"
 
     except Exception as e:
         return f"[System Error] {str(e)}"
   
   def __str__(self) -> str:
     s = "Volume name: " + self.name
+    s += "\nVolume label: " + self.label
     s += "\nVolume information:\n"
     for key in NTFS.info:
       s += f"{key}: {self.boot_sector[key]}\n"
+    s += format_space(self.volume_stats()) + "\n"
     return s
   
   def __del__(self):
@@ -0,0 +1,111 @@
+import asyncio
+from itertools import islice
+
+from FAT32 import FAT32
+from NTFS import NTFS
+
+
+class AsyncVolumeFile:
+    """Bản async của VolumeFile: mỗi lần đọc chạy trong thread pool"""
+    def __init__(self, volume, f) -> None:
+        self.volume = volume
+        self.f = f
+        self.name = f.name
+        self.size = f.size
+
+    async def read(self, size=-1) -> bytes:
+        return await self.volume._call(self.f.read, size)
+
+    async def read_range(self, offset, size) -> bytes:
+        return await self.volume._call(self.f.read_range, offset, size)
+
+    def seek(self, offset, whence=0):
+        return self.f.seek(offset, whence)
+
+    def tell(self):
+        return self.f.tell()
+
+    async def close(self):
+        self.f.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+class AsyncVolume:
+    """Giao diện asyncio cho một volume FAT32/NTFS.
+
+    Mọi thao tác blocking được đẩy sang thread pool (asyncio.to_thread); thiết bị
+    đọc bằng pread và các cache của volume an toàn đa luồng, nên các yêu cầu trên
+    cùng một volume hay trên nhiều volume đều chạy xen kẽ tự do.
+    """
+    volume_class = None
+
+    def __init__(self, fs) -> None:
+        self.fs = fs
+
+    @classmethod
+    async def open(cls, name: str):
+        return cls(await asyncio.to_thread(cls.volume_class, name))
+
+    async def _call(self, func, *args, **kwargs):
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+    async def list_directory(self, path=""):
+        return await self._call(self.fs.list_directory, path)
+
+    async def lookup(self, path: str):
+        return await self._call(self.fs.lookup, path)
+
+    async def read_text_file(self, path: str) -> str:
+        return await self._call(self.fs.read_text_file, path)
+
+    async def read_file_bytes(self, path: str) -> bytes:
+        def read():
+            node = self.fs.lookup(path)
+            if not node:
+                raise FileNotFoundError("File not found")
+            return self.fs.read_file_bytes(node)
+        return await self._call(read)
+
+    async def open_file(self, path: str) -> AsyncVolumeFile:
+        return AsyncVolumeFile(self, await self._call(self.fs.open_file, path))
+
+    async def walk(self, path="", from_root=False, batch=256):
+        """Duyệt cây thư mục như fs.walk; mỗi lô batch entry được lấy trong thread pool"""
+        it = self.fs.walk(path, from_root)
+        while True:
+            items = await self._call(lambda: list(islice(it, batch)))
+            if not items:
+                return
+            for item in items:
+                yield item
+
+    async def find(self, pattern, size_range=None, mtime_range=None, attrs=None):
+        return await self._call(self.fs.find, pattern, size_range, mtime_range, attrs)
+
+    async def du(self, path="") -> dict:
+        return await self._call(self.fs.du, path)
+
+    def __str__(self) -> str:
+        return str(self.fs)
+
+
+class AsyncFAT32(AsyncVolume):
+    volume_class = FAT32
+
+
+class AsyncNTFS(AsyncVolume):
+    volume_class = NTFS
+
+
+async def open_volume(name: str) -> AsyncVolume:
+    """Mở volume bất đồng bộ, tự nhận dạng FAT32 hay NTFS"""
+    if await asyncio.to_thread(FAT32.is_fat32, name):
+        return await AsyncFAT32.open(name)
+    if await asyncio.to_thread(NTFS.is_ntfs, name):
+        return await AsyncNTFS.open(name)
+    raise ValueError(f"Unsupported file system on {name}")
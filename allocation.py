@@ -0,0 +1,135 @@
+import re
+import heapq
+
+# Chuỗi >= 4 byte 0 liên tiếp: chỉ những đoạn này mới có thể chứa entry FAT trống (4 byte, căn 4)
+FAT_ZERO_RUN = re.compile(rb"\x00{4,}")
+# Byte bitmap toàn 0 (8 cluster trống), toàn 1 (8 cluster đã dùng) hoặc byte lẫn
+BITMAP_TOKEN = re.compile(rb"\x00+|\xff+|[\x01-\xfe]")
+
+
+def fat_free_runs(raw_fat: bytes, first: int, end: int) -> 'list[tuple[int, int]]':
+    """Các đoạn cluster trống (cluster đầu, độ dài) trong [first, end) của bảng FAT32.
+
+    Quét bằng regex trên dữ liệu thô (chạy trong C) rồi căn lề 4 byte, nên số bước
+    Python tỉ lệ với số đoạn chứ không phải số cluster.
+    """
+    runs = []
+    view = memoryview(raw_fat)[first * 4:end * 4]
+    for m in FAT_ZERO_RUN.finditer(view):
+        start = -(-m.start() // 4)
+        stop = m.end() // 4
+        if stop > start:
+            runs.append((first + start, stop - start))
+    return runs
+
+
+def bitmap_free_runs(bitmap: bytes, total: int) -> 'list[tuple[int, int]]':
+    """Các đoạn cluster trống từ bitmap cấp phát NTFS (bit 0 = trống)"""
+    runs = []
+    run_start = None
+    for m in BITMAP_TOKEN.finditer(bitmap):
+        base = m.start() * 8
+        if base >= total:
+            break
+        byte = bitmap[m.start()]
+        if byte == 0:
+            if run_start is None:
+                run_start = base
+        elif byte == 0xFF:
+            if run_start is not None:
+                runs.append((run_start, base - run_start))
+                run_start = None
+        else:
+            for bit in range(8):
+                if byte >> bit & 1:
+                    if run_start is not None:
+                        runs.append((run_start, base + bit - run_start))
+                        run_start = None
+                elif run_start is None:
+                    run_start = base + bit
+    if run_start is not None:
+        runs.append((run_start, total - run_start))
+    return [(start, min(length, total - start)) for start, length in runs if start < total]
+
+
+def count_set_bits(bitmap: bytes, start: int, length: int) -> int:
+    # Số bit 1 (cluster đã cấp phát) trong đoạn [start, start + length) của bitmap
+    if length <= 0:
+        return 0
+    chunk = int.from_bytes(bitmap[start >> 3:(start + length + 7) >> 3], 'little')
+    chunk = (chunk >> (start & 7)) & ((1 << length) - 1)
+    return chunk.bit_count()
+
+
+def complement_runs(runs, first: int, end: int) -> 'list[tuple[int, int]]':
+    # Phần bù (các đoạn đã dùng) của danh sách đoạn trống đã sắp xếp
+    used = []
+    pos = first
+    for start, length in runs:
+        if start > pos:
+            used.append((pos, start - pos))
+        pos = start + length
+    if pos < end:
+        used.append((pos, end - pos))
+    return used
+
+
+def allocation_map(free_runs, first: int, end: int) -> dict:
+    free = sum(length for _, length in free_runs)
+    return {
+        "Total clusters": end - first,
+        "Free clusters": free,
+        "Used clusters": end - first - free,
+        "Free": free_runs,
+        "Used": complement_runs(free_runs, first, end),
+    }
+
+
+def space_stats(total: int, free, cluster_bytes: int) -> dict:
+    # Dung lượng tổng/trống/đã dùng theo cluster và byte; free None: chưa biết
+    used = None if free is None else total - free
+    return {
+        "Cluster size": cluster_bytes,
+        "Total clusters": total,
+        "Free clusters": free,
+        "Used clusters": used,
+        "Total bytes": total * cluster_bytes,
+        "Free bytes": None if free is None else free * cluster_bytes,
+        "Used bytes": None if used is None else used * cluster_bytes,
+    }
+
+
+def format_space(stats: dict) -> str:
+    # Dòng tóm tắt dung lượng cho __str__ của volume
+    def size(value):
+        return "?" if value is None else f"{value / (1 << 20):.1f} MB"
+    return (f"Total: {size(stats['Total bytes'])}, Used: {size(stats['Used bytes'])}, "
+            f"Free: {size(stats['Free bytes'])} ({stats['Free source'] or 'pending'})")
+
+
+def fragmentation_stats(fs, top=10) -> dict:
+    """Thống kê phân mảnh: số đoạn (extent) của mỗi file trên toàn volume"""
+    files = 0
+    fragmented = 0
+    fragments = 0
+    worst = []
+    for info in fs.walk(from_root=True):
+        if info["Node"].is_directory():
+            continue
+        count = sum(1 for start, _ in fs.get_extents(info["Node"]) if start is not None)
+        files += 1
+        fragments += count
+        if count > 1:
+            fragmented += 1
+            item = (count, info["Path"])
+            if len(worst) < top:
+                heapq.heappush(worst, item)
+            else:
+                heapq.heappushpop(worst, item)
+    return {
+        "Files": files,
+        "Fragmented files": fragmented,
+        "Fragmented %": 100.0 * fragmented / files if files else 0.0,
+        "Average fragments": fragments / files if files else 0.0,
+        "Most fragmented": [{"Path": path, "Fragments": count} for count, path in sorted(worst, reverse=True)],
+    }
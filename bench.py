@@ -0,0 +1,179 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import multiprocessing
+import platform
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+
+from imagegen import build_tree, build_fat32, build_ntfs, build_disk
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux trả về KB, macOS trả về byte
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def make_image(fs_type, args):
+    name = "%s_f%d_o%d_d%d_n%d_%s_r%g_s%d.img" % (
+        fs_type, args.files, args.fanout, args.files_per_dir, args.name_len,
+        "lfn" if args.lfn else "83", args.fragmentation, args.seed)
+    path = os.path.join(args.workdir, name)
+    if not os.path.exists(path):
+        rng = random.Random(args.seed)
+        root = build_tree(args.files, args.fanout, args.files_per_dir, args.name_len, args.lfn,
+                          args.min_size, args.max_size, 0.0, rng)
+        build = build_fat32 if fs_type == "fat32" else build_ntfs
+        build(path, root, fragmentation=args.fragmentation, rng=rng)
+    return path
+
+
+def best_of(repeat, func):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def run_benchmark(fs_type, path, repeat):
+    """Đo một loại file system (chạy trong process riêng để peak RSS không lẫn nhau)"""
+    if fs_type == "fat32":
+        from FAT32 import FAT32 as cls
+    else:
+        from NTFS import NTFS as cls
+
+    results = {}
+    results["init_s"], fs = best_of(repeat, lambda: cls(path))
+    infos = list(fs.walk(from_root=True))
+    dirs = [""] + [i["Path"] for i in infos if i["Node"].is_directory()]
+    files = [i for i in infos if not i["Node"].is_directory()]
+
+    results["list_directory_s"], _ = best_of(repeat, lambda: [fs.list_directory(d) for d in dirs])
+    results["list_directory_per_dir_us"] = results["list_directory_s"] / len(dirs) * 1e6
+    results["open_directory_s"], _ = best_of(repeat, lambda: [fs.open_directory(d) for d in dirs[1:]])
+    results["open_directory_per_path_us"] = results["open_directory_s"] / max(1, len(dirs) - 1) * 1e6
+
+    total = sum(i["Size"] for i in files)
+    results["read_text_file_s"], _ = best_of(repeat, lambda: [fs.read_text_file(i["Path"]) for i in files])
+    results["read_text_file_MBps"] = total / (1 << 20) / results["read_text_file_s"] if results["read_text_file_s"] else 0.0
+    results["files"] = len(files)
+    results["directories"] = len(dirs)
+    results["bytes"] = total
+    results["peak_rss_mb"] = peak_rss_mb()
+    return results
+
+
+def run_partition_benchmark(path, count, repeat):
+    """Mở ảnh đĩa 1 phân vùng so với ảnh đĩa count phân vùng giống hệt (Disk.open_volumes).
+
+    Mỗi lần đo mở lại ảnh (Disk mới, cache block rỗng); cả hai dùng cùng số process parse
+    MFT cho mỗi phân vùng. Tỉ lệ gần 1 nghĩa là các phân vùng được mở song song thật sự,
+    gần count nghĩa là thời gian mở cộng dồn (cần ít nhất count CPU để đạt tỉ lệ thấp).
+    """
+    from partition import Disk, cpu_count
+
+    cpus = cpu_count()
+    workers = max(2, cpus // count) if cpus > 1 else None
+    results = {"cpus": cpus, "partitions": count, "mft_workers": workers}
+    for n in (1, count):
+        disk_path = "%s_disk%d.img" % (os.path.splitext(path)[0], n)
+        if not os.path.exists(disk_path):
+            build_disk(disk_path, [path] * n)
+
+        def open_all():
+            with Disk(disk_path) as disk:
+                return len(disk.open_volumes(workers=workers))
+
+        results["open_%d_partitions_s" % n], _ = best_of(repeat, open_all)
+    single = results["open_1_partitions_s"]
+    results["open_ratio"] = results["open_%d_partitions_s" % count] / single if single else float("nan")
+    return results
+
+
+def git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(current, baseline):
+    print(f"{'metric':40} {'baseline':>12} {'current':>12} {'ratio':>8}")
+    for fs_type, metrics in current["results"].items():
+        base = baseline.get("results", {}).get(fs_type, {})
+        for key, value in metrics.items():
+            old = base.get(key)
+            if not isinstance(value, (int, float)) or not isinstance(old, (int, float)):
+                continue
+            ratio = value / old if old else float("nan")
+            print(f"{fs_type + '.' + key:40} {old:12.4f} {value:12.4f} {ratio:8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FAT32/NTFS trên ảnh đĩa tổng hợp")
+    parser.add_argument("--fs", choices=["fat32", "ntfs", "both"], default="both")
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--fanout", type=int, default=4)
+    parser.add_argument("--files-per-dir", type=int, default=50)
+    parser.add_argument("--name-len", type=int, default=20)
+    parser.add_argument("--no-lfn", dest="lfn", action="store_false")
+    parser.add_argument("--fragmentation", type=float, default=0.0)
+    parser.add_argument("--min-size", type=int, default=0)
+    parser.add_argument("--max-size", type=int, default=16 * 1024)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workdir", default="bench_images")
+    parser.add_argument("--partitions", type=int, default=0,
+                        help="Đo thêm thời gian mở ảnh đĩa N phân vùng giống nhau so với 1 phân vùng")
+    parser.add_argument("--save", help="Ghi kết quả ra file JSON baseline")
+    parser.add_argument("--compare", help="So sánh với file JSON baseline")
+    args = parser.parse_args()
+
+    os.makedirs(args.workdir, exist_ok=True)
+    fs_types = ["fat32", "ntfs"] if args.fs == "both" else [args.fs]
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "params": {k: v for k, v in vars(args).items() if k not in ("save", "compare")},
+        },
+        "results": {},
+    }
+    for fs_type in fs_types:
+        path = make_image(fs_type, args)
+        # Process "spawn" mới cho mỗi lần đo để peak RSS không tính bộ nhớ của bước sinh ảnh
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            report["results"][fs_type] = pool.submit(run_benchmark, fs_type, path, args.repeat).result()
+            if args.partitions > 1:
+                report["results"][fs_type + "_partitions"] = pool.submit(
+                    run_partition_benchmark, path, args.partitions, args.repeat).result()
+
+    print(json.dumps(report, indent=2))
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
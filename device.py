@@ -0,0 +1,261 @@
+import os
+import stat
+import threading
+from collections import OrderedDict
+
+
+def device_path(name: str) -> str:
+    """Đường dẫn thiết bị của volume: file ảnh đĩa nếu tồn tại, ngược lại là volume thô \\\\.\\X:"""
+    if os.path.isfile(name):
+        return name
+    return r'\\.\%s' % name
+
+
+def device_size(fd):
+    """Kích thước file ảnh đĩa; None với volume/thiết bị thô.
+
+    Chỉ tin SEEK_END với file thường: handle \\\\.\\X: trên Windows có thể seek tới cuối
+    thành công nhưng trả về 0 hoặc giá trị sai, khiến mọi lần đọc bị cắt thành rỗng.
+    """
+    try:
+        if not stat.S_ISREG(os.fstat(fd.fileno()).st_mode):
+            return None
+        return fd.seek(0, os.SEEK_END)
+    except (OSError, AttributeError, ValueError):
+        return None
+
+
+class BlockDevice:
+    """Lớp I/O dưới FAT32/NTFS: căn lề theo block, gộp yêu cầu liền kề, đọc trước và cache block.
+
+    Mọi yêu cầu (offset, size) được mở rộng thành các block block_size byte. Block
+    đã có trong cache LRU (tối đa cache_blocks block) không phải đọc lại; các block
+    thiếu liền nhau được đọc bằng một lần gọi. Khi phát hiện đọc tuần tự, cửa sổ
+    đọc trước nhân đôi dần đến max_readahead byte. Yêu cầu lớn hơn direct_size byte
+    đi thẳng xuống thiết bị (vẫn căn lề) để không đẩy metadata ra khỏi cache.
+    """
+    def __init__(self, fd, block_size=4096, cache_blocks=2048, max_readahead=1 << 20, direct_size=1 << 20) -> None:
+        self.fd = fd
+        self.block_size = block_size
+        self.cache_blocks = cache_blocks
+        self.max_readahead = max_readahead // block_size
+        self.direct_size = direct_size
+        self.cache: OrderedDict[int, bytes] = OrderedDict()
+        # lock bảo vệ cache và bộ đếm; seek_lock chỉ dùng khi phải seek + read
+        self.lock = threading.Lock()
+        self.seek_lock = threading.Lock()
+        # Đọc theo vị trí (pread) nên không dùng chung con trỏ seek giữa các thread
+        if hasattr(fd, 'pread'):
+            self.pread = fd.pread
+        elif hasattr(os, 'pread'):
+            fileno = fd.fileno()
+            self.pread = lambda size, offset: os.pread(fileno, size, offset)
+        else:
+            self.pread = None
+        self.readahead = 0
+        self.next_offset = None
+        # Volume thô: không giới hạn, dựa vào đọc ngắn ở cuối thiết bị
+        self.size = device_size(fd)
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.requested_bytes = 0
+        self.requests = 0
+        self.device_bytes = 0
+        self.device_reads = 0
+        self.readahead_bytes = 0
+        self.block_hits = 0
+        self.block_misses = 0
+
+    def stats(self) -> dict:
+        return {
+            "Requests": self.requests,
+            "Requested bytes": self.requested_bytes,
+            "Device reads": self.device_reads,
+            "Device bytes": self.device_bytes,
+            "Read-ahead bytes": self.readahead_bytes,
+            "Block hits": self.block_hits,
+            "Block misses": self.block_misses,
+            "Saved reads": self.requests - self.device_reads,
+        }
+
+    def _pread(self, offset, size) -> bytes:
+        if self.size is not None:
+            size = max(0, min(size, self.size - offset))
+        if size <= 0:
+            return b""
+        if self.pread:
+            return self.pread(size, offset)
+        # Windows không có os.pread: seek + read dưới lock riêng của file
+        with self.seek_lock:
+            self.fd.seek(offset)
+            return self.fd.read(size)
+
+    def _read_device(self, offset, size) -> bytes:
+        # Gọi xuống thiết bị; không giữ lock cache nên nhiều thread đọc song song được
+        data = self._pread(offset, size)
+        if not data:
+            return data
+        with self.lock:
+            self.device_reads += 1
+            self.device_bytes += len(data)
+        return data
+
+    def _store(self, index, data):
+        self.cache[index] = data
+        if len(self.cache) > self.cache_blocks:
+            self.cache.popitem(last=False)
+
+    def _plan(self, first, last, readahead):
+        # (gọi khi giữ lock) Lấy block có sẵn trong cache và các đoạn block thiếu [start, end);
+        # đọc trước chỉ gắn vào đoạn thiếu cuối cùng của yêu cầu
+        blocks = {}
+        runs = []
+        for index in range(first, last + 1):
+            block = self.cache.get(index)
+            if block is not None:
+                self.cache.move_to_end(index)
+                self.block_hits += 1
+                blocks[index] = block
+                continue
+            self.block_misses += 1
+            if runs and runs[-1][1] == index:
+                runs[-1][1] = index + 1
+            else:
+                runs.append([index, index + 1])
+        if runs and runs[-1][1] == last + 1:
+            end = last + 1
+            while end < last + 1 + readahead and end not in self.cache:
+                end += 1
+            runs[-1][1] = end
+        return blocks, runs
+
+    def read_at(self, offset, size) -> bytes:
+        """Đọc size byte tại offset (byte) của thiết bị; an toàn khi gọi từ nhiều thread"""
+        bs = self.block_size
+        first = offset // bs
+        last = (offset + size - 1) // bs
+        with self.lock:
+            self.requests += 1
+            self.requested_bytes += max(0, size)
+            if size <= 0:
+                return b""
+            sequential = offset == self.next_offset
+            self.next_offset = offset + size
+            direct = size > self.direct_size
+            if not direct:
+                if sequential:
+                    self.readahead = min(self.max_readahead, max(self.readahead * 2, last - first + 1))
+                else:
+                    self.readahead = 0
+                blocks, runs = self._plan(first, last, self.readahead)
+
+        if direct:
+            start = first * bs
+            data = self._read_device(start, (last + 1) * bs - start)
+            return data[offset - start:offset - start + size]
+
+        fetched = []
+        for run_start, run_end in runs:
+            data = self._read_device(run_start * bs, (run_end - run_start) * bs)
+            for i in range(run_start, run_end):
+                chunk = data[(i - run_start) * bs:(i - run_start + 1) * bs]
+                if not chunk:
+                    break
+                fetched.append((i, chunk))
+                blocks[i] = chunk
+        if fetched:
+            with self.lock:
+                for i, chunk in fetched:
+                    if i > last:
+                        self.readahead_bytes += len(chunk)
+                    self._store(i, chunk)
+
+        data = b"".join(blocks[i] for i in range(first, last + 1) if i in blocks)
+        start = offset - first * bs
+        return data[start:start + size]
+
+    def read_uncached(self, offset, size) -> bytes:
+        """Đọc thẳng từ thiết bị cho các lượt quét lớn chạy nền (vd. đếm $Bitmap).
+
+        Không qua cache block, không đổi trạng thái đọc trước và không cộng vào thống kê,
+        nên không đẩy metadata ra khỏi cache hay làm lệch số liệu của các lần đọc khác.
+        """
+        return self._pread(offset, size)
+
+    def read_many(self, requests) -> 'list[bytes]':
+        """Đọc nhiều đoạn (offset, size): sắp xếp, gộp các đoạn kề/chồng nhau rồi cắt lại theo thứ tự gốc"""
+        order = sorted(range(len(requests)), key=lambda i: requests[i][0])
+        results = [b""] * len(requests)
+        group = []
+        group_start = group_end = None
+
+        def flush():
+            data = self.read_at(group_start, group_end - group_start)
+            with self.lock:
+                self.requests += len(group) - 1
+                self.requested_bytes += sum(requests[i][1] for i in group) - (group_end - group_start)
+            for i in group:
+                offset, size = requests[i]
+                results[i] = data[offset - group_start:offset - group_start + size]
+
+        for i in order:
+            offset, size = requests[i]
+            if group and offset <= group_end:
+                group.append(i)
+                group_end = max(group_end, offset + size)
+            else:
+                if group:
+                    flush()
+                group = [i]
+                group_start, group_end = offset, offset + size
+        if group:
+            flush()
+        return results
+
+    def clear_cache(self):
+        with self.lock:
+            self.cache.clear()
+            self.next_offset = None
+            self.readahead = 0
+
+    def close(self):
+        self.cache.clear()
+        self.fd.close()
+
+
+class PartitionView:
+    """Cửa sổ [base, base + size) trên một BlockDevice dùng chung (một phân vùng của ảnh đĩa).
+
+    Offset truyền vào là offset trong phân vùng; cache block và thống kê là của thiết bị chung.
+    """
+    def __init__(self, dev: BlockDevice, base: int, size: int) -> None:
+        self.dev = dev
+        self.fd = dev.fd
+        self.base = base
+        self.size = size
+
+    def clip(self, offset, size):
+        # Không đọc vượt ra ngoài phân vùng (size None: không biết kích thước)
+        if self.size is None:
+            return size
+        return max(0, min(size, self.size - offset))
+
+    def read_at(self, offset, size) -> bytes:
+        return self.dev.read_at(self.base + offset, self.clip(offset, size))
+
+    def read_uncached(self, offset, size) -> bytes:
+        return self.dev.read_uncached(self.base + offset, self.clip(offset, size))
+
+    def read_many(self, requests) -> 'list[bytes]':
+        return self.dev.read_many([(self.base + offset, self.clip(offset, size)) for offset, size in requests])
+
+    def stats(self) -> dict:
+        return self.dev.stats()
+
+    def clear_cache(self):
+        self.dev.clear_cache()
+
+    def close(self):
+        # Thiết bị thuộc về Disk, không đóng ở đây
+        pass
@@ -0,0 +1,102 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from partition import open_volume
+
+# Kích thước mỗi lần đọc khi so nội dung; dừng ngay ở khối khác nhau đầu tiên
+COMPARE_CHUNK = 1 << 20
+
+
+def snapshot(fs) -> dict:
+    """{khóa: (đường dẫn, thư mục?, kích thước, mtime, extent, node)} từ fs.diff_entries()"""
+    return {key: rest for key, *rest in fs.diff_entries()}
+
+
+def same_content(fs_a, node_a, fs_b, node_b, size) -> bool:
+    # So trực tiếp hai bên theo từng khối thay vì băm: không cần đọc hết khi khác nhau sớm.
+    # Extent của mỗi bên được lấy một lần rồi dùng cho mọi khối
+    extents_a = fs_a.get_extents(node_a)
+    extents_b = fs_b.get_extents(node_b)
+    for offset in range(0, size, COMPARE_CHUNK):
+        if (fs_a.read_range(node_a, offset, COMPARE_CHUNK, extents_a)
+                != fs_b.read_range(node_b, offset, COMPARE_CHUNK, extents_b)):
+            return False
+    return True
+
+
+def match_renames(removed, added):
+    # Không có khóa bền vững (FAT32): cặp xóa/thêm có cùng cluster đầu, kích thước và mtime là đổi tên
+    by_signature = {}
+    for key, (path, is_dir, size, mtime, extents, node) in removed.items():
+        if extents:
+            by_signature.setdefault((extents[0][0], size, mtime, is_dir), []).append(key)
+    renamed = []
+    for key, (path, is_dir, size, mtime, extents, node) in list(added.items()):
+        if not extents:
+            continue
+        candidates = by_signature.get((extents[0][0], size, mtime, is_dir))
+        if candidates:
+            old_key = candidates.pop()
+            renamed.append((old_key, key))
+    return renamed
+
+
+def diff(fs_a, fs_b, max_workers=4) -> dict:
+    """So sánh hai ảnh chụp của cùng một volume (fs_a: trước, fs_b: sau).
+
+    Entry được ghép theo khóa của fs.diff_entries(): (số bản ghi MFT, sequence) với NTFS,
+    đường dẫn với FAT32. Cặp khác kích thước là "Modified"; cặp trùng kích thước, mtime và
+    extent là không đổi; chỉ các cặp còn lại (metadata không kết luận được) mới được so
+    nội dung, song song trong thread pool. Chi phí đọc vì vậy tỉ lệ với số thay đổi chứ
+    không với dung lượng volume. Hai bên được duyệt song song.
+    """
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(2, max_workers)) as pool:
+        before, after = pool.map(snapshot, (fs_a, fs_b))
+
+        removed = {key: value for key, value in before.items() if key not in after}
+        added = {key: value for key, value in after.items() if key not in before}
+        pairs = [(before[key], after[key]) for key in before.keys() & after.keys()]
+        for old_key, new_key in match_renames(removed, added):
+            pairs.append((removed.pop(old_key), added.pop(new_key)))
+
+        result = {
+            "Added": sorted(value[0] for value in added.values()),
+            "Removed": sorted(value[0] for value in removed.values()),
+            "Renamed": [],
+            "Modified": [],
+            "Metadata changed": [],
+            "Unchanged": 0,
+            "Compared": 0,
+        }
+        ambiguous = []
+        for old, new in pairs:
+            old_path, old_dir, old_size, old_mtime, old_extents, old_node = old
+            new_path, new_dir, new_size, new_mtime, new_extents, new_node = new
+            if old_path != new_path:
+                result["Renamed"].append((old_path, new_path))
+            if old_dir or new_dir:
+                continue
+            if old_size != new_size:
+                result["Modified"].append(new_path)
+            elif old_mtime == new_mtime and old_extents == new_extents:
+                result["Unchanged"] += 1
+            else:
+                ambiguous.append((new_path, old_node, new_node, new_size))
+
+        same = pool.map(lambda item: same_content(fs_a, item[1], fs_b, item[2], item[3]), ambiguous)
+        for (path, _, _, _), equal in zip(ambiguous, same):
+            result["Metadata changed" if equal else "Modified"].append(path)
+    result["Compared"] = len(ambiguous)
+    result["Renamed"].sort()
+    result["Modified"].sort()
+    result["Metadata changed"].sort()
+    result["Seconds"] = time.perf_counter() - start_time
+    return result
+
+
+def diff_images(name_a: str, name_b: str, max_workers=4) -> dict:
+    """Mở song song hai volume/ảnh (tự nhận dạng FAT32/NTFS) rồi so sánh như diff()"""
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        fs_a, fs_b = pool.map(open_volume, (name_a, name_b))
+    return diff(fs_a, fs_b, max_workers)
@@ -0,0 +1,114 @@
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from extract import first_cluster
+
+
+def group_by(items, key):
+    groups = {}
+    for item in items:
+        groups.setdefault(key(item), []).append(item)
+    return groups
+
+
+def partial_digest(fs, node, size, cluster_bytes, algorithm) -> str:
+    # Băm cluster đầu và cluster cuối (hai lần đọc theo vị trí); với file <= 2 cluster đây là băm toàn bộ nội dung
+    h = hashlib.new(algorithm)
+    h.update(fs.read_range(node, 0, cluster_bytes))
+    last = (size - 1) // cluster_bytes * cluster_bytes
+    if last > 0:
+        h.update(fs.read_range(node, last, size - last))
+    return h.hexdigest()
+
+
+def full_digest(fs, node, algorithm) -> str:
+    h = hashlib.new(algorithm)
+    for chunk in fs.iter_file_content(node):
+        h.update(chunk)
+    return h.hexdigest()
+
+
+def find_duplicates(fs, path="", min_size=1, max_workers=4, algorithm="sha256"):
+    """Tìm các file trùng nội dung dưới `path` (mặc định cả volume, kể cả file hidden/system),
+    lọc dần để đọc càng ít càng tốt.
+
+    1. Gom theo kích thước (có sẵn trong metadata, không đọc); kích thước duy nhất bị loại.
+    2. File có cùng danh sách extent dùng chung dữ liệu vật lý (hard link/cross-link):
+       nhận ra từ metadata, chỉ cần băm một đại diện.
+    3. Băm cluster đầu và cuối của các ứng viên; file không quá 2 cluster thì đây đã là
+       toàn bộ nội dung.
+    4. Chỉ băm toàn bộ các file vẫn còn trùng.
+    Mỗi bước đọc theo thứ tự cluster vật lý, chạy trong thread pool.
+    Trả về (nhóm trùng, nhóm hard link, thống kê).
+    """
+    start_time = time.perf_counter()
+    cluster_bytes = fs.SC * fs.BS
+    files = [info for info in fs.walk(path, from_root=not path, include_hidden=True)
+             if not info["Node"].is_directory() and info["Size"] >= min_size]
+
+    candidates = [group for group in group_by(files, lambda info: info["Size"]).values() if len(group) > 1]
+
+    def physical_key(info):
+        # Cùng extent => cùng dữ liệu; file không chiếm cluster (resident, toàn sparse) không so được
+        extents = tuple(fs.get_extents(info["Node"]))
+        return extents if any(start is not None for start, _ in extents) else id(info)
+
+    # Giữ một đại diện cho mỗi nhóm dùng chung dữ liệu, các đường dẫn còn lại đi kèm
+    hard_links = []
+    representatives = []
+    for group in candidates:
+        by_extents = group_by(group, physical_key)
+        for members in by_extents.values():
+            if len(members) > 1:
+                hard_links.append({"Size": members[0]["Size"], "Paths": sorted(info["Path"] for info in members)})
+            representatives.append((members[0], [info["Path"] for info in members]))
+
+    def run(stage, items):
+        # Đọc theo cluster vật lý đầu tiên; pool.map giữ thứ tự kết quả
+        items = sorted(items, key=lambda item: first_cluster(fs, item[0]["Node"]))
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return list(zip(items, pool.map(stage, items)))
+
+    size_groups = group_by(representatives, lambda item: item[0]["Size"])
+    partial = [item for group in size_groups.values() if len(group) > 1 for item in group]
+    partial_hashed = run(lambda item: partial_digest(fs, item[0]["Node"], item[0]["Size"], cluster_bytes, algorithm),
+                         partial)
+
+    final = []
+    full = []
+    for (size, digest), group in group_by(partial_hashed, lambda pair: (pair[0][0]["Size"], pair[1])).items():
+        if len(group) < 2:
+            continue
+        if size <= 2 * cluster_bytes:
+            # Cluster đầu + cuối đã phủ toàn bộ file
+            final.extend(group)
+        else:
+            full.extend(item for item, _ in group)
+    final.extend(run(lambda item: full_digest(fs, item[0]["Node"], algorithm), full))
+
+    groups = []
+    for (size, digest), group in group_by(final, lambda pair: (pair[0][0]["Size"], pair[1])).items():
+        if len(group) < 2:
+            continue
+        paths = sorted(p for item, _ in group for p in item[1])
+        groups.append({
+            "Size": size,
+            "Hash": digest,
+            "Paths": paths,
+            "Wasted bytes": size * (len(group) - 1),
+        })
+    groups.sort(key=lambda group: group["Wasted bytes"], reverse=True)
+
+    elapsed = time.perf_counter() - start_time
+    stats = {
+        "Files": len(files),
+        "Size candidates": sum(len(group) for group in candidates),
+        "Hard link groups": len(hard_links),
+        "Partially hashed": len(partial),
+        "Fully hashed": len(full),
+        "Duplicate groups": len(groups),
+        "Wasted bytes": sum(group["Wasted bytes"] for group in groups),
+        "Seconds": elapsed,
+    }
+    return groups, hard_links, stats
@@ -0,0 +1,134 @@
+import os
+import sqlite3
+import time
+
+FORMAT_VERSION = 3
+
+SCHEMA = [
+    "CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)",
+    # Mốc thời gian là FILETIME nguyên (100 ns từ 1601-01-01); fn_* và sequence chỉ có với NTFS
+    """CREATE TABLE entries (
+        id INTEGER PRIMARY KEY, parent INTEGER, name TEXT, path TEXT, size INTEGER,
+        flags INTEGER, is_dir INTEGER, record_flag INTEGER,
+        modified INTEGER, accessed INTEGER, changed INTEGER, created INTEGER,
+        fn_modified INTEGER, fn_accessed INTEGER, fn_changed INTEGER, fn_created INTEGER,
+        sequence INTEGER)""",
+    # content_offset: vị trí dữ liệu resident trong bản ghi MFT (NULL nếu non-resident)
+    """CREATE TABLE streams (
+        entry INTEGER, name TEXT, size INTEGER, resident INTEGER, compressed INTEGER,
+        compression_unit INTEGER, sparse INTEGER, content_offset INTEGER)""",
+    # lcn NULL: run sparse
+    "CREATE TABLE extents (entry INTEGER, stream TEXT, seq INTEGER, lcn INTEGER, count INTEGER)",
+]
+# Tạo sau khi nạp xong dữ liệu: rẻ hơn nhiều so với cập nhật index theo từng dòng
+INDEXES = [
+    "CREATE INDEX entries_parent ON entries(parent)",
+    "CREATE INDEX entries_path ON entries(path)",
+    "CREATE INDEX entries_name ON entries(name)",
+    "CREATE INDEX entries_modified ON entries(modified)",
+    "CREATE INDEX streams_entry ON streams(entry)",
+    "CREATE INDEX extents_entry ON extents(entry, stream, seq)",
+]
+PRAGMAS = [
+    "PRAGMA journal_mode=OFF",
+    "PRAGMA synchronous=OFF",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+]
+
+
+def export_sqlite(fs, db_path, batch_size=10000) -> dict:
+    """Ghi toàn bộ metadata của volume (entry, stream, extent) vào CSDL SQLite db_path.
+
+    Dòng lấy từ fs.sqlite_rows(), được ghi bằng executemany theo lô batch_size trong
+    một transaction duy nhất; index được tạo sau khi nạp. Với NTFS, file này cũng là
+    cache để mở lại volume mà không quét lại MFT (NTFS(name, cache=db_path)).
+    """
+    start_time = time.perf_counter()
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    con = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        for pragma in PRAGMAS:
+            con.execute(pragma)
+        for statement in SCHEMA:
+            con.execute(statement)
+        con.execute("BEGIN")
+        entries = []
+        streams = []
+        extents = []
+        count = 0
+
+        def flush():
+            con.executemany("INSERT INTO entries VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)", entries)
+            con.executemany("INSERT INTO streams VALUES (?,?,?,?,?,?,?,?)", streams)
+            con.executemany("INSERT INTO extents VALUES (?,?,?,?,?)", extents)
+            entries.clear()
+            streams.clear()
+            extents.clear()
+
+        for row, row_streams, row_extents in fs.sqlite_rows():
+            entries.append(row)
+            streams.extend((row[0],) + stream for stream in row_streams)
+            extents.extend((row[0],) + extent for extent in row_extents)
+            count += 1
+            if len(entries) >= batch_size:
+                flush()
+        flush()
+        meta = dict(fs.volume_meta(), Format=FORMAT_VERSION)
+        con.executemany("INSERT INTO meta VALUES (?, ?)", [(k, str(v)) for k, v in meta.items()])
+        con.execute("COMMIT")
+        for statement in INDEXES:
+            con.execute(statement)
+    finally:
+        con.close()
+
+    elapsed = time.perf_counter() - start_time
+    return {
+        "Rows": count,
+        "Seconds": elapsed,
+        "Rows/min": count * 60 / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def open_cache(db_path, fs):
+    """Mở CSDL đã xuất làm cache; None nếu không có hoặc không khớp volume hiện tại"""
+    if not db_path or not os.path.exists(db_path):
+        return None
+    con = sqlite3.connect(db_path)
+    try:
+        meta = dict(con.execute("SELECT key, value FROM meta"))
+    except sqlite3.DatabaseError:
+        con.close()
+        return None
+    expected = dict(fs.volume_meta(), Format=FORMAT_VERSION)
+    if any(meta.get(k) != str(v) for k, v in expected.items()):
+        con.close()
+        return None
+    return con
+
+
+def iter_cached_entries(con, batch_size=10000):
+    """(dòng entry, {tên stream: dòng stream}, {tên stream: [(lcn, count)]}) theo id, đọc theo lô"""
+    entries = con.execute("SELECT * FROM entries ORDER BY id")
+    streams = con.execute("SELECT * FROM streams ORDER BY entry")
+    extents = con.execute("SELECT entry, stream, lcn, count FROM extents ORDER BY entry, stream, seq")
+    stream_row = streams.fetchone()
+    extent_row = extents.fetchone()
+    while True:
+        rows = entries.fetchmany(batch_size)
+        if not rows:
+            return
+        for row in rows:
+            entry_id = row[0]
+            row_streams = {}
+            row_extents = {}
+            while stream_row is not None and stream_row[0] <= entry_id:
+                if stream_row[0] == entry_id:
+                    row_streams[stream_row[1]] = stream_row
+                stream_row = streams.fetchone()
+            while extent_row is not None and extent_row[0] <= entry_id:
+                if extent_row[0] == entry_id:
+                    row_extents.setdefault(extent_row[1], []).append((extent_row[2], extent_row[3]))
+                extent_row = extents.fetchone()
+            yield row, row_streams, row_extents
@@ -0,0 +1,285 @@
+import sys
+import time
+from array import array
+from itertools import chain
+
+from allocation import complement_runs, fat_free_runs
+
+BAD_CLUSTER = 0x0FFFFFF7
+END_OF_CHAIN = 0x0FFFFFF8  # 0x0FFFFFF8..0x0FFFFFFF đều là cuối chuỗi
+MASK_HIGH_NIBBLE = bytes(b & 0x0F for b in range(256))
+# Số phần tử tối đa liệt kê trong mỗi mục của báo cáo
+REPORT_LIMIT = 1000
+
+
+def masked_table(raw_fat: bytes, end: int) -> 'tuple[bytearray, array]':
+    # Entry FAT32 chỉ dùng 28 bit thấp: bỏ 4 bit cao của mọi entry trong một lượt translate (chạy trong C); trả về cả bản thô lẫn mảng
+    raw = bytearray(raw_fat[:end * 4])
+    raw[3::4] = raw[3::4].translate(MASK_HIGH_NIBBLE)
+    elements = array('I')
+    elements.frombytes(raw)
+    if sys.byteorder == 'big':
+        elements.byteswap()
+    return raw, elements
+
+
+def contiguous_runs(raw: bytes, first: int, end: int) -> 'list[tuple[int, int]]':
+    """Các đoạn (cluster đầu, độ dài) mà mọi entry trỏ tới cluster kế tiếp (fat[c] == c + 1).
+
+    XOR bảng FAT với dãy c + 1 (phép XOR số nguyên lớn chạy trong C): entry 0 sau XOR là
+    liên kết liên tiếp, tìm bằng cùng bộ quét đoạn 0 như tìm cluster trống.
+    """
+    expected = array('I', range(1, end + 1))
+    if sys.byteorder == 'big':
+        expected.byteswap()
+    xor = (int.from_bytes(raw[:end * 4], 'little') ^ int.from_bytes(expected, 'little')).to_bytes(end * 4, 'little')
+    return fat_free_runs(xor, first, end)
+
+
+def contiguous_run_ends(raw: bytes, first: int, end: int, runs=None) -> array:
+    # run_end[c] = cluster ngay sau đoạn liên tiếp chứa c; 0 nếu không (runs: kết quả contiguous_runs nếu đã có)
+    run_end = array('I', bytes(4 * end))
+    for start, count in contiguous_runs(raw, first, end) if runs is None else runs:
+        run_end[start:start + count] = array('I', [start + count]) * count
+    return run_end
+
+
+def directory_entries(fs):
+    """(đường dẫn, entry) của mọi entry còn dùng, kể cả file hệ thống; kèm các thư mục không đọc được.
+
+    Khác walk(): không bỏ qua entry có thuộc tính system (chuỗi cluster của chúng vẫn được
+    cấp phát) và một thư mục hỏng không làm dừng cả lượt duyệt.
+    """
+    entries = []
+    unreadable = []
+    root = fs.boot_sector["start_cluster_RDET"]
+    stack = [("", fs.DET[root])]
+    visited = {root}
+    while stack:
+        prefix, cdet = stack.pop()
+        for entry in cdet.entries:
+            if entry.is_subentry or entry.is_empty or entry.is_label or entry.is_deleted:
+                continue
+            if entry.long_name in (".", ".."):
+                continue
+            path = f"{prefix}\\{entry.long_name}" if prefix else entry.long_name
+            entries.append((path, entry))
+            if entry.is_directory() and entry.start_cluster >= 2 and entry.start_cluster not in visited:
+                visited.add(entry.start_cluster)
+                try:
+                    stack.append((path, fs.read_directory(entry)))
+                except Exception:
+                    unreadable.append(path)
+    return entries, unreadable
+
+
+def chain_length(fat, start, end, limit) -> 'tuple[int, str]':
+    # Độ dài chuỗi từ start, dừng sau tối đa limit bước (chống vòng lặp)
+    length = 0
+    cluster = start
+    while length < limit:
+        length += 1
+        nxt = fat[cluster]
+        if nxt >= END_OF_CHAIN:
+            return length, "ok"
+        if nxt < 2 or nxt >= end or nxt == BAD_CLUSTER or fat[nxt] == 0:
+            return length, "broken"
+        cluster = nxt
+    return length, "cycle"
+
+
+def check_fat(fs) -> dict:
+    """Kiểm tra nhất quán bảng FAT kiểu chkdsk (chỉ đọc, không sửa).
+
+    Bảng FAT được xử lý theo đoạn: cluster đang dùng là phần bù của các đoạn trống, các
+    đoạn liên kết liên tiếp (fat[c] == c + 1) được tìm bằng cùng bộ quét regex, bậc vào
+    nằm trong một bytearray và chỉ các cluster ngoài hai loại đoạn đó mới được xét từng
+    cái, nên không có tập số nguyên nào theo từng cluster; chuỗi đầu là cluster dùng có
+    bậc vào 0. Mỗi cluster được đi qua đúng một lần khi lần theo các chuỗi
+    (mảng owner ghi chuỗi đã đi qua), nên vòng lặp bị phát hiện mà không cần giới hạn
+    thời gian; các đoạn cluster liên tiếp được đánh dấu cả đoạn một lượt. Báo cáo: chuỗi giao nhau
+    (cross-link), chuỗi thất lạc, vòng lặp, chuỗi đứt, độ dài chuỗi không khớp kích
+    thước file và các entry khác nhau giữa FAT chính và các bản sao.
+    """
+    start_time = time.perf_counter()
+    first, end = fs.cluster_range()
+    end = min(end, len(fs.FAT[0].elements))
+    raw, fat = masked_table(fs.FAT[0].raw_data, end)
+
+    # Bậc vào của mỗi cluster (bão hòa ở 2) trong bytearray: liên kết liên tiếp được cộng cả
+    # đoạn một lượt; chỉ các cluster còn lại (cuối chuỗi, bước nhảy, bad, giá trị lỗi) đi từng cái
+    free_runs = fat_free_runs(raw, first, end)
+    link_runs = contiguous_runs(raw, first, end)
+    in_degree = bytearray(end)
+    for start, count in link_runs:
+        stop = min(start + count + 1, end)
+        in_degree[start + 1:stop] = b"\x01" * (stop - start - 1)
+    other_runs = complement_runs(sorted(free_runs + link_runs), first, end)
+    bad = set()
+    shared = []
+    for cluster in chain.from_iterable(range(start, start + count) for start, count in other_runs):
+        nxt = fat[cluster]
+        if nxt == BAD_CLUSTER:
+            bad.add(cluster)
+        elif first <= nxt < end:
+            if in_degree[nxt] == 1:
+                shared.append(nxt)
+            in_degree[nxt] = min(in_degree[nxt] + 1, 2)
+    used_runs = complement_runs(free_runs, first, end)
+    used_count = sum(count for _, count in used_runs) - len(bad)
+    # Cluster bên trong đoạn liên tiếp luôn có bậc vào 1: chuỗi đầu chỉ có thể là đầu đoạn hoặc cluster còn lại
+    heads = sorted(cluster for cluster in chain((start for start, _ in link_runs),
+                                                chain.from_iterable(range(start, start + count)
+                                                                    for start, count in other_runs))
+                   if not in_degree[cluster] and cluster not in bad)
+
+    # Tham chiếu từ entry thư mục (và thư mục gốc)
+    entries, unreadable = directory_entries(fs)
+    root = fs.boot_sector["start_cluster_RDET"]
+    references = {root: ["\\"]}
+    for path, entry in entries:
+        if entry.start_cluster >= 2:
+            references.setdefault(entry.start_cluster, []).append(path)
+
+    owner = array('I', bytes(4 * end))
+    lengths = {}
+    broken = []
+    cycles = []
+    merges = {}
+    merged_heads = set()
+    loop_joins = set()
+    visited = 0
+    run_end = contiguous_run_ends(raw, first, end, link_runs)
+    for head in heads:
+        cluster = head
+        length = 0
+        while True:
+            stop = run_end[cluster]
+            if stop > cluster + 1 and not owner[stop - 1]:
+                # Đoạn liên tiếp chưa chuỗi nào đi qua (phần đã đi qua luôn là phần cuối đoạn): đánh dấu một lượt
+                owner[cluster:stop] = array('I', [head]) * (stop - cluster)
+                length += stop - cluster
+                cluster = stop - 1
+            else:
+                owner[cluster] = head
+                length += 1
+            nxt = fat[cluster]
+            if nxt >= END_OF_CHAIN:
+                break
+            if nxt < 2 or nxt >= end or nxt in bad or fat[nxt] == 0:
+                broken.append({"Start": head, "Cluster": cluster, "Next": nxt})
+                break
+            if owner[nxt]:
+                if owner[nxt] == head:
+                    # Chuỗi quay lại chính nó tại nxt
+                    loop_joins.add(nxt)
+                    cycles.append({"Start": head, "Cluster": nxt, "Paths": references.get(head, [])})
+                else:
+                    # Chuỗi này nhập vào chuỗi khác tại nxt
+                    merges.setdefault(nxt, []).append(head)
+                    merged_heads.add(head)
+                break
+            cluster = nxt
+        lengths[head] = length
+        visited += length
+
+    # Cluster dùng mà không chuỗi nào đi tới: các vòng kín không có cluster đầu
+    loop_ids = set()
+    if visited < used_count:
+        # Chỉ đi qua các đoạn owner == 0 (cùng bộ quét đoạn 0) bên trong các đoạn đã dùng
+        owner_bytes = owner.tobytes()
+        unowned = [run for start, count in used_runs for run in fat_free_runs(owner_bytes, start, start + count)]
+        del owner_bytes
+        for cluster in chain.from_iterable(range(start, start + count) for start, count in unowned):
+            if owner[cluster] or cluster in bad:
+                continue
+            loop_id = cluster
+            loop_ids.add(loop_id)
+            length = 0
+            paths = []
+            while first <= cluster < end and not owner[cluster]:
+                owner[cluster] = loop_id
+                length += 1
+                paths += references.get(cluster, [])
+                cluster = fat[cluster]
+            cycles.append({"Start": None, "Cluster": loop_id, "Length": length, "Paths": paths})
+
+    cross_linked = []
+    for cluster, paths in references.items():
+        if len(paths) > 1 or (first <= cluster < end and in_degree[cluster] and owner[cluster] not in loop_ids):
+            # Nhiều entry cùng trỏ một cluster, hoặc entry trỏ vào giữa chuỗi khác
+            cross_linked.append({"Cluster": cluster, "Paths": list(paths)})
+    for cluster, merged in merges.items():
+        paths = list(references.get(owner[cluster], [f"<lost chain {owner[cluster]}>"]))
+        for head in merged:
+            paths += references.get(head, [f"<lost chain {head}>"])
+        cross_linked.append({"Cluster": cluster, "Paths": paths})
+    for cluster in sorted(shared):
+        # Nhiều chuỗi cùng trỏ vào một cluster mà lượt lần theo không đi tới (vd. cluster đó trống)
+        if cluster not in merges and cluster not in loop_joins and cluster not in bad:
+            cross_linked.append({"Cluster": cluster, "Paths": []})
+
+    lost = [{"Start": head, "Length": lengths[head]} for head in heads if head not in references]
+
+    cluster_bytes = fs.SC * fs.BS
+    size_mismatches = []
+    invalid_starts = []
+    for path, entry in entries:
+        start = entry.start_cluster
+        if start >= end or (start >= 2 and fat[start] == 0) or start in bad:
+            invalid_starts.append({"Path": path, "Cluster": start})
+            continue
+        if entry.is_directory():
+            continue
+        expected = -(-entry.size // cluster_bytes)
+        if start < 2:
+            count = 0
+        elif start in lengths and start not in merged_heads:
+            count = lengths[start]
+        else:
+            # Entry trỏ vào giữa chuỗi khác, chuỗi nhập vào chuỗi khác hoặc vòng lặp: đi có giới hạn
+            count, status = chain_length(fat, start, end, used_count + 1)
+            if status == "cycle":
+                continue  # Đã báo trong "Cycles"
+        if count != expected:
+            size_mismatches.append({"Path": path, "Size": entry.size, "Clusters": count, "Expected": expected})
+
+    mirrors = []
+    for index in range(1, len(fs.FAT)):
+        mirror = fs.FAT[index].raw_data
+        if mirror[:end * 4] == fs.FAT[0].raw_data[:end * 4]:
+            continue
+        differing = compare_tables(fs.FAT[0].raw_data, mirror, end)
+        mirrors.append({"Copy": index, "Clusters": len(differing), "First": differing[:REPORT_LIMIT]})
+
+    return {
+        "Clusters": end - first,
+        "Used clusters": used_count,
+        "Bad clusters": len(bad),
+        "Chains": len(heads),
+        "Cross-linked": cross_linked[:REPORT_LIMIT],
+        "Lost chains": lost[:REPORT_LIMIT],
+        "Lost clusters": sum(chain["Length"] for chain in lost),
+        "Cycles": cycles[:REPORT_LIMIT],
+        "Broken chains": broken[:REPORT_LIMIT],
+        "Invalid starts": invalid_starts[:REPORT_LIMIT],
+        "Size mismatches": size_mismatches[:REPORT_LIMIT],
+        "Mirror mismatches": mirrors,
+        "Unreadable directories": unreadable,
+        "Seconds": time.perf_counter() - start_time,
+    }
+
+
+def compare_tables(primary: bytes, mirror: bytes, end: int, block=4096) -> 'list[int]':
+    # Chỉ số cluster có entry khác nhau; so từng khối (trong C) rồi mới so từng entry trong khối lệch
+    differing = []
+    length = min(len(primary), len(mirror), end * 4)
+    for offset in range(0, length, block):
+        a = primary[offset:offset + block]
+        b = mirror[offset:offset + block]
+        if a == b:
+            continue
+        for pos in range(0, min(len(a), len(b)), 4):
+            if a[pos:pos + 4] != b[pos:pos + 4]:
+                differing.append((offset + pos) // 4)
+    return differing
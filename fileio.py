@@ -0,0 +1,80 @@
+import io
+import os
+
+
+def read_extents(fs, extents, offset, size, uncached=False) -> bytes:
+    """Đọc size byte bắt đầu tại byte offset của file từ danh sách đoạn (cluster đầu, số cluster).
+
+    Các đoạn được quy về vị trí byte trên thiết bị rồi đọc một lượt qua fs.dev.read_many;
+    đoạn sparse (cluster đầu là None) trả về byte 0. uncached=True: đọc từng đoạn bằng
+    fs.dev.read_uncached (quét lớn, không làm bẩn cache block).
+    """
+    cluster_bytes = fs.SC * fs.BS
+    end = offset + size
+    pieces = []
+    pos = 0
+    for start, count in extents:
+        length = count * cluster_bytes
+        if pos + length > offset and pos < end:
+            lo = max(offset, pos)
+            hi = min(end, pos + length)
+            pieces.append((None if start is None else fs.cluster_byte_offset(start) + lo - pos, hi - lo))
+        pos += length
+        if pos >= end:
+            break
+    requests = [piece for piece in pieces if piece[0] is not None]
+    if uncached:
+        data = iter([fs.dev.read_uncached(dev_offset, length) for dev_offset, length in requests])
+    else:
+        data = iter(fs.dev.read_many(requests))
+    return b"".join(bytes(length) if dev_offset is None else next(data) for dev_offset, length in pieces)
+
+
+class VolumeFile(io.RawIOBase):
+    """File chỉ đọc, seek được, trên một entry của volume (kết quả của open_file)"""
+    def __init__(self, fs, node, size, name) -> None:
+        super().__init__()
+        self.fs = fs
+        self.node = node
+        self.size = size
+        self.name = name
+        self.pos = 0
+        # Danh sách extent tính một lần khi đọc lần đầu: mỗi lần đọc/seek sau chỉ cắt khoảng byte trên đó
+        # (FAT32 không phải lần lại chuỗi FAT cho mỗi chunk)
+        self.extents = None
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def read_range(self, offset, size) -> bytes:
+        # Đọc theo vị trí, không đổi con trỏ file
+        if self.extents is None:
+            self.extents = self.fs.get_extents(self.node)
+        return self.fs.read_range(self.node, offset, size, self.extents)
+
+    def readinto(self, b):
+        data = self.read_range(self.pos, len(b))
+        n = len(data)
+        b[:n] = data
+        self.pos += n
+        return n
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        if whence == os.SEEK_SET:
+            pos = offset
+        elif whence == os.SEEK_CUR:
+            pos = self.pos + offset
+        elif whence == os.SEEK_END:
+            pos = self.size + offset
+        else:
+            raise ValueError(f"Invalid whence ({whence})")
+        if pos < 0:
+            raise ValueError("Negative seek position")
+        self.pos = pos
+        return pos
+
+    def tell(self):
+        return self.pos
@@ -0,0 +1,96 @@
+import csv
+import hashlib
+import queue
+import threading
+import time
+
+from extract import first_cluster
+
+DEFAULT_ALGORITHMS = ("md5", "sha1", "sha256")
+
+
+def hash_worker(jobs: queue.Queue, algorithms, results, errors):
+    # Mỗi worker giữ bộ băm của file đang xử lý; chunk của cùng 1 file luôn
+    # đến đúng worker đó theo thứ tự nên không cần khóa
+    hashers = None
+    while True:
+        item = jobs.get()
+        if item is None:
+            return
+        index, chunk = item
+        try:
+            if hashers is None:
+                hashers = [hashlib.new(name) for name in algorithms]
+            if chunk is None:
+                results[index].update({name: h.hexdigest() for name, h in zip(algorithms, hashers)})
+                hashers = None
+            else:
+                for h in hashers:
+                    h.update(chunk)  # hashlib nhả GIL với chunk lớn
+        except Exception as e:
+            errors.append(e)
+
+
+def compute_hashes(fs, path="", algorithms=DEFAULT_ALGORITHMS, max_workers=4, queue_depth=8):
+    """Băm toàn bộ file dưới `path` bằng nhiều thuật toán trong một lượt đọc.
+
+    Mặc định là cả volume (từ thư mục gốc), kể cả file hidden/system; bỏ qua metafile NTFS.
+
+    Thread gọi hàm đọc dữ liệu thô theo thứ tự cluster vật lý và đẩy chunk vào
+    hàng đợi có giới hạn của các worker, nên đọc đĩa và băm chạy chồng lên nhau.
+    Trả về (manifest, thống kê).
+    """
+    start_time = time.perf_counter()
+    node = fs.lookup(path) if path else None
+    if node is not None and not node.is_directory():
+        info = fs.entry_info(node)
+        info["Path"] = "\\".join(fs.parse_path(path))
+        info["Node"] = node
+        files = [info]
+    else:
+        files = [info for info in fs.walk(path, from_root=not path, include_hidden=True)
+                 if not info["Node"].is_directory()]
+    files.sort(key=lambda info: first_cluster(fs, info["Node"]))
+
+    manifest = [{"Path": info["Path"], "Size": info["Size"]} for info in files]
+    errors = []
+    queues = [queue.Queue(maxsize=queue_depth) for _ in range(max_workers)]
+    threads = [threading.Thread(target=hash_worker, args=(q, algorithms, manifest, errors), daemon=True)
+               for q in queues]
+    for t in threads:
+        t.start()
+
+    total = 0
+    try:
+        for index, info in enumerate(files):
+            jobs = queues[index % max_workers]
+            for chunk in fs.iter_file_content(info["Node"]):
+                jobs.put((index, chunk))
+                total += len(chunk)
+            jobs.put((index, None))
+    finally:
+        for q in queues:
+            q.put(None)
+        for t in threads:
+            t.join()
+    if errors:
+        raise errors[0]
+
+    manifest.sort(key=lambda item: item["Path"])
+    elapsed = time.perf_counter() - start_time
+    stats = {
+        "Files": len(files),
+        "Bytes": total,
+        "Seconds": elapsed,
+        "GB/s": total / (1 << 30) / elapsed if elapsed > 0 else 0.0,
+    }
+    return manifest, stats
+
+
+def write_manifest(manifest, out_path, algorithms=DEFAULT_ALGORITHMS):
+    """Ghi manifest (path, size, các digest) ra file CSV"""
+    with open(out_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Path", "Size", *algorithms])
+        for item in manifest:
+            writer.writerow([item["Path"], item["Size"], *(item.get(name, "") for name in algorithms)])
@@ -0,0 +1,165 @@
+import argparse
+import json
+import re
+import shutil
+from datetime import datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+from partition import open_volume
+
+# Kích thước mỗi lần đọc khi gửi nội dung file (bộ nhớ mỗi kết nối chỉ phụ thuộc giá trị này)
+CHUNK_SIZE = 1 << 20
+RANGE_PATTERN = re.compile(r"bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header, size):
+    """Khoảng byte [start, end) từ header Range; None nếu không dùng được.
+
+    Chỉ hỗ trợ một khoảng ("bytes=a-b", "bytes=a-", "bytes=-n"); header nhiều khoảng
+    hoặc sai cú pháp bị bỏ qua (trả về toàn bộ file, RFC 9110 cho phép).
+    Khoảng nằm ngoài file ném ValueError (416).
+    """
+    match = RANGE_PATTERN.match(header.strip())
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+    first, last = match.groups()
+    if first == "":
+        start, end = max(0, size - int(last)), size
+    else:
+        start = int(first)
+        end = size if last == "" else min(size, int(last) + 1)
+    if start >= size or start >= end:
+        raise ValueError("Range not satisfiable")
+    return start, end
+
+
+def json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    return str(value)
+
+
+class VolumeRequestHandler(BaseHTTPRequestHandler):
+    """GET/HEAD trên volume của server: thư mục trả về JSON (list_directory), file trả về nội dung.
+
+    Đường dẫn URL là đường dẫn trong volume ("/" là thư mục gốc, "/a/b.txt:stream" là ADS
+    trên NTFS). Nội dung được đọc từng đoạn CHUNK_SIZE qua fs.read_range nên một Range ở giữa
+    file lớn chỉ đọc đúng các cluster chứa khoảng byte được yêu cầu.
+    """
+    server_version = "VolumeHTTP/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.handle_path(send_body=True)
+
+    def do_HEAD(self):
+        self.handle_path(send_body=False)
+
+    def handle_path(self, send_body):
+        fs = self.server.fs
+        path = unquote(urlsplit(self.path).path).strip("/")
+        try:
+            node = fs.lookup(path) if path else None
+            if not path or (node and node.is_directory()):
+                self.send_listing(fs.list_directory(path), send_body)
+                return
+            f = fs.open_file(path)
+        except FileNotFoundError:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return
+        except Exception as e:
+            self.send_error(HTTPStatus.NOT_FOUND, str(e))
+            return
+        with f:
+            self.send_file(f, send_body)
+
+    def send_listing(self, entries, send_body):
+        body = json.dumps(entries, default=json_default, ensure_ascii=False).encode("utf-8")
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def send_file(self, f, send_body):
+        size = f.size
+        try:
+            byte_range = parse_range(self.headers.get("Range", ""), size)
+        except ValueError:
+            self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+            self.send_header("Content-Range", f"bytes */{size}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if byte_range is None:
+            start, end = 0, size
+            self.send_response(HTTPStatus.OK)
+        else:
+            start, end = byte_range
+            self.send_response(HTTPStatus.PARTIAL_CONTENT)
+            self.send_header("Content-Range", f"bytes {start}-{end - 1}/{size}")
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(end - start))
+        self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+        if not send_body:
+            return
+        f.seek(start)
+        try:
+            shutil.copyfileobj(LimitedReader(f, end - start), self.wfile, CHUNK_SIZE)
+        except (BrokenPipeError, ConnectionResetError):
+            # Client đóng kết nối giữa chừng (vd. trình phát video chuyển vị trí)
+            self.close_connection = True
+
+
+class LimitedReader:
+    """Đọc tối đa remaining byte từ file (phần cuối của một Range)"""
+    def __init__(self, f, remaining) -> None:
+        self.f = f
+        self.remaining = remaining
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.f.read(size) if size else b""
+        self.remaining -= len(data)
+        return data
+
+
+class VolumeHTTPServer(ThreadingHTTPServer):
+    """HTTP server chỉ đọc trên một volume FAT32/NTFS đã mở.
+
+    Mỗi kết nối chạy trên một thread riêng; volume và thiết bị bên dưới an toàn đa
+    luồng (pread, cache có khóa) nên nhiều client được phục vụ đồng thời.
+    """
+    daemon_threads = True
+
+    def __init__(self, fs, address=("127.0.0.1", 8000)) -> None:
+        self.fs = fs
+        super().__init__(address, VolumeRequestHandler)
+
+
+def serve(fs, host="127.0.0.1", port=8000):
+    with VolumeHTTPServer(fs, (host, port)) as server:
+        print(f"Serving {fs.name} on http://{host}:{server.server_address[1]}/")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP server chỉ đọc trên volume FAT32/NTFS")
+    parser.add_argument("volume", help="Tên volume (vd. E:) hoặc đường dẫn ảnh")
+    parser.add_argument("--partition", type=int, help="Số thứ tự phân vùng trên ảnh toàn đĩa")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    serve(open_volume(args.volume, args.partition), args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
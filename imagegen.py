@@ -0,0 +1,686 @@
+import argparse
+import random
+import shutil
+import struct
+import uuid
+import zlib
+from array import array
+from datetime import datetime, timedelta
+
+import lznt1
+
+SECTOR = 512
+EPOCH_START = datetime(2000, 1, 1)
+EPOCH_SPAN = 24 * 365 * 86400
+
+
+class Node:
+    """Một file/thư mục trong cây sinh ngẫu nhiên"""
+    def __init__(self, name, is_dir, size=0, parent=None):
+        self.name = name
+        self.is_dir = is_dir
+        self.size = size
+        self.parent = parent
+        self.children: list[Node] = []
+        self.clusters: list[int] = []
+        self.content = b""
+        self.runs = None
+        self.stored = b""
+        self.streams: list[tuple[str, bytes, list[int]]] = []
+        self.mtime = None
+        self.ctime = None
+        self.deleted = False
+
+
+class Allocator:
+    """Cấp phát cluster tuần tự, có thể tạo phân mảnh bằng cách chừa lỗ trống"""
+    def __init__(self, first, count, fragmentation, rng):
+        self.next = first
+        self.end = first + count
+        self.fragmentation = fragmentation
+        self.rng = rng
+        self.holes: list[int] = []
+
+    def allocate(self, n):
+        out = []
+        while len(out) < n:
+            if self.holes and self.rng.random() < self.fragmentation:
+                out.append(self.holes.pop(0))
+                continue
+            if self.next >= self.end:
+                if not self.holes:
+                    raise ValueError("Image too small")
+                out.append(self.holes.pop(0))
+                continue
+            out.append(self.next)
+            self.next += 1
+            if self.rng.random() < self.fragmentation and len(out) < n:
+                gap = self.rng.randint(1, 3)
+                for c in range(self.next, min(self.next + gap, self.end)):
+                    self.holes.append(c)
+                self.next = min(self.next + gap, self.end)
+        return out
+
+
+def make_name(rng, index, length, lfn, is_dir):
+    if not lfn:
+        base = "%07X" % index
+        return ("D" + base) if is_dir else ("F" + base + ".TXT")
+    letters = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    stem = "".join(rng.choice(letters) for _ in range(max(1, length - 8)))
+    return f"{stem}_{index:06d}" + ("" if is_dir else ".txt")
+
+
+def build_tree(files, fanout, files_per_dir, name_len, lfn, min_size, max_size, deleted, rng):
+    root = Node("", True)
+    dirs = [root]
+    n_dirs = max(1, -(-files // max(1, files_per_dir)))
+    queue = [root]
+    index = 0
+    while len(dirs) < n_dirs and queue:
+        parent = queue.pop(0)
+        for _ in range(fanout):
+            if len(dirs) >= n_dirs:
+                break
+            index += 1
+            d = Node(make_name(rng, index, name_len, lfn, True), True, parent=parent)
+            parent.children.append(d)
+            dirs.append(d)
+            queue.append(d)
+    for i in range(files):
+        index += 1
+        parent = dirs[i % len(dirs)]
+        size = rng.randint(min_size, max_size)
+        f = Node(make_name(rng, index, name_len, lfn, False), False, size, parent)
+        f.deleted = rng.random() < deleted
+        parent.children.append(f)
+    for node in iter_nodes(root):
+        node.mtime = EPOCH_START + timedelta(seconds=rng.randrange(EPOCH_SPAN))
+        node.ctime = node.mtime - timedelta(seconds=rng.randrange(86400 * 30))
+        if not node.is_dir:
+            line = ("%s %d\n" % (node.name, node.size)).encode()
+            node.content = (line * (node.size // len(line) + 1))[:node.size]
+    return root
+
+
+def iter_nodes(root):
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(reversed(node.children))
+
+
+# ---------------------------------------------------------------- FAT32
+
+def fat_time(dt):
+    return (dt.hour << 11) | (dt.minute << 5) | (dt.second // 2)
+
+
+def fat_date(dt):
+    return ((dt.year - 1980) << 9) | (dt.month << 5) | dt.day
+
+
+def short_name_of(node, index):
+    if "." not in node.name and node.name.isupper() and len(node.name) <= 8:
+        return node.name.encode().ljust(8), b"   "
+    if not node.is_dir and node.name.upper().endswith(".TXT") and node.name[:-4].isupper() and len(node.name) <= 12:
+        return node.name[:-4].encode().ljust(8), b"TXT"
+    return ("~%07X" % index).encode(), (b"   " if node.is_dir else b"TXT")
+
+
+def lfn_checksum(short):
+    s = 0
+    for b in short:
+        s = (((s & 1) << 7) + (s >> 1) + b) & 0xFF
+    return s
+
+
+def dir_entry(short, ext, attr, cluster, size, mtime, ctime, deleted=False):
+    e = bytearray(32)
+    e[0:8] = short
+    e[8:11] = ext
+    e[11] = attr
+    e[13] = ctime.microsecond // 10000 if ctime else 0
+    t = ctime or mtime
+    struct.pack_into("<HHH", e, 14, fat_time(t), fat_date(t), fat_date(mtime))
+    struct.pack_into("<H", e, 20, cluster >> 16)
+    struct.pack_into("<HH", e, 22, fat_time(mtime), fat_date(mtime))
+    struct.pack_into("<H", e, 26, cluster & 0xFFFF)
+    struct.pack_into("<I", e, 28, size)
+    if deleted:
+        e[0] = 0xE5
+    return bytes(e)
+
+
+def lfn_entries(name, short_full, deleted=False):
+    raw = name.encode("utf-16le")
+    chars = [raw[i:i + 2] for i in range(0, len(raw), 2)]
+    if len(chars) % 13:
+        chars.append(b"\x00\x00")
+    while len(chars) % 13:
+        chars.append(b"\xff\xff")
+    checksum = lfn_checksum(short_full)
+    parts = [chars[i:i + 13] for i in range(0, len(chars), 13)]
+    out = []
+    for seq, part in enumerate(parts, 1):
+        e = bytearray(32)
+        e[0] = seq | (0x40 if seq == len(parts) else 0)
+        e[1:11] = b"".join(part[0:5])
+        e[11] = 0x0F
+        e[13] = checksum
+        e[14:26] = b"".join(part[5:11])
+        e[28:32] = b"".join(part[11:13])
+        if deleted:
+            e[0] = 0xE5
+        out.append(bytes(e))
+    return list(reversed(out))
+
+
+def build_fat32(path, root, sectors_per_cluster=8, label="SYNTHFAT", fragmentation=0.0, rng=None, slack=1.25):
+    rng = rng or random.Random(0)
+    cluster_bytes = SECTOR * sectors_per_cluster
+    nodes = list(iter_nodes(root))
+    need = 0
+    for node in nodes:
+        if node.is_dir:
+            entries = 3 + sum(1 + (-(-len(c.name) // 13)) for c in node.children)
+            need += -(-entries * 32 // cluster_bytes)
+        else:
+            need += -(-node.size // cluster_bytes)
+    n_clusters = int(need * slack) + 64
+    reserved = 32
+    fat_sectors = -(-(n_clusters + 2) * 4 // SECTOR)
+    n_fats = 2
+    data_start = reserved + n_fats * fat_sectors
+    total_sectors = data_start + n_clusters * sectors_per_cluster
+
+    fat = array("I", [0]) * (n_clusters + 2)
+    fat[0] = 0x0FFFFFF8
+    fat[1] = 0x0FFFFFFF
+    alloc = Allocator(2, n_clusters, fragmentation, rng)
+    root.clusters = alloc.allocate(1)
+    for node in nodes:
+        if node is root:
+            continue
+        if node.is_dir:
+            entries = 3 + sum(1 + (-(-len(c.name) // 13)) for c in node.children)
+            node.clusters = alloc.allocate(max(1, -(-entries * 32 // cluster_bytes)))
+        elif node.size:
+            node.clusters = alloc.allocate(-(-node.size // cluster_bytes))
+    for node in nodes:
+        if node.deleted:
+            continue
+        for a, b in zip(node.clusters, node.clusters[1:]):
+            fat[a] = b
+        if node.clusters:
+            fat[node.clusters[-1]] = 0x0FFFFFFF
+    # Thư mục gốc cần đủ cluster cho toàn bộ entry
+    root_entries = 2 + sum(1 + (-(-len(c.name) // 13)) for c in root.children)
+    extra = -(-root_entries * 32 // cluster_bytes) - 1
+    if extra > 0:
+        more = alloc.allocate(extra)
+        chain = root.clusters + more
+        for a, b in zip(chain, chain[1:]):
+            fat[a] = b
+        fat[chain[-1]] = 0x0FFFFFFF
+        root.clusters = chain
+    free = sum(1 for c in range(2, n_clusters + 2) if fat[c] == 0)
+
+    with open(path, "wb") as f:
+        f.truncate(total_sectors * SECTOR)
+        boot = bytearray(SECTOR)
+        boot[0:3] = b"\xEB\x58\x90"
+        boot[3:11] = b"MSWIN4.1"
+        struct.pack_into("<HBHBHHBHHHI", boot, 11, SECTOR, sectors_per_cluster, reserved, n_fats, 0, 0, 0xF8, 0, 63, 255, 0)
+        struct.pack_into("<IIHHIHH", boot, 32, total_sectors, fat_sectors, 0, 0, 2, 1, 6)
+        boot[0x40] = 0x80
+        boot[0x42] = 0x29
+        struct.pack_into("<I", boot, 0x43, rng.getrandbits(32))
+        boot[0x47:0x52] = label.encode()[:11].ljust(11)
+        boot[0x52:0x5A] = b"FAT32   "
+        boot[510:512] = b"\x55\xAA"
+        fsinfo = bytearray(SECTOR)
+        struct.pack_into("<I", fsinfo, 0, 0x41615252)
+        struct.pack_into("<III", fsinfo, 0x1E4, 0x61417272, free, alloc.next)
+        fsinfo[510:512] = b"\x55\xAA"
+        f.seek(0)
+        f.write(boot)
+        f.write(fsinfo)
+        f.seek(6 * SECTOR)
+        f.write(boot)
+        f.write(fsinfo)
+        fat_raw = fat.tobytes()
+        for i in range(n_fats):
+            f.seek((reserved + i * fat_sectors) * SECTOR)
+            f.write(fat_raw)
+
+        def write_chain(clusters, data):
+            for i, c in enumerate(clusters):
+                chunk = data[i * cluster_bytes:(i + 1) * cluster_bytes]
+                if not chunk:
+                    break
+                f.seek((data_start + (c - 2) * sectors_per_cluster) * SECTOR)
+                f.write(chunk)
+
+        index = 0
+        for node in nodes:
+            if not node.is_dir:
+                write_chain(node.clusters, node.content)
+                continue
+            raw = bytearray()
+            if node is root:
+                raw += dir_entry(label.encode()[:8].ljust(8), label.encode()[8:11].ljust(3), 0x08, 0, 0, node.mtime, None)
+            else:
+                parent_cluster = 0 if node.parent is root else node.parent.clusters[0]
+                raw += dir_entry(b".       ", b"   ", 0x10, node.clusters[0], 0, node.mtime, node.ctime)
+                raw += dir_entry(b"..      ", b"   ", 0x10, parent_cluster, 0, node.mtime, node.ctime)
+            for child in node.children:
+                index += 1
+                short, ext = short_name_of(child, index)
+                cluster = child.clusters[0] if child.clusters else 0
+                if short.startswith(b"~"):
+                    raw += b"".join(lfn_entries(child.name, short + ext, child.deleted))
+                attr = 0x10 if child.is_dir else 0x20
+                raw += dir_entry(short, ext, attr, cluster, 0 if child.is_dir else child.size,
+                                 child.mtime, child.ctime, child.deleted)
+            write_chain(node.clusters, bytes(raw))
+    return path
+
+
+# ---------------------------------------------------------------- NTFS
+
+def filetime(dt):
+    return int((dt - datetime(1601, 1, 1)).total_seconds()) * 10000000
+
+
+def local_filetime(dt):
+    # as_datetime() dùng giờ địa phương nên ghi timestamp theo epoch của máy hiện tại
+    return int(dt.timestamp()) * 10000000 + 116444736000000000
+
+
+def attr_resident(type_id, content, name="", attr_id=0):
+    name_raw = name.encode("utf-16le")
+    header_len = 0x18 + len(name_raw)
+    content_off = (header_len + 7) & ~7
+    length = (content_off + len(content) + 7) & ~7
+    a = bytearray(length)
+    struct.pack_into("<IIBBHHHIHBB", a, 0, type_id, length, 0, len(name) and len(name_raw) // 2,
+                     0x18, 0, attr_id, len(content), content_off, 0, 0)
+    a[0x18:0x18 + len(name_raw)] = name_raw
+    a[content_off:content_off + len(content)] = content
+    return bytes(a)
+
+
+def encode_runs(runs):
+    out = bytearray()
+    prev = 0
+    for lcn, length in runs:
+        len_raw = length.to_bytes((length.bit_length() + 8) // 8, "little")
+        if lcn is None:
+            out.append(len(len_raw))
+            out += len_raw
+            continue
+        delta = lcn - prev
+        n = 1
+        while not -(1 << (8 * n - 1)) <= delta < (1 << (8 * n - 1)):
+            n += 1
+        out.append((n << 4) | len(len_raw))
+        out += len_raw
+        out += delta.to_bytes(n, "little", signed=True)
+        prev = lcn
+    out.append(0)
+    return bytes(out)
+
+
+def attr_nonresident(type_id, runs, size, cluster_bytes, name="", flags=0, unit=0, attr_id=0):
+    name_raw = name.encode("utf-16le")
+    header = 0x48 if flags & 0x0001 else 0x40
+    name_off = header
+    runs_off = (name_off + len(name_raw) + 7) & ~7
+    run_raw = encode_runs(runs)
+    length = (runs_off + len(run_raw) + 7) & ~7
+    clusters = sum(n for _, n in runs)
+    a = bytearray(length)
+    struct.pack_into("<IIBBHHH", a, 0, type_id, length, 1, len(name_raw) // 2, name_off, flags, attr_id)
+    struct.pack_into("<qqHH", a, 0x10, 0, max(clusters - 1, 0), runs_off, unit)
+    struct.pack_into("<qqq", a, 0x28, clusters * cluster_bytes, size, size)
+    if flags & 0x0001:
+        struct.pack_into("<q", a, 0x40, clusters * cluster_bytes)
+    a[name_off:name_off + len(name_raw)] = name_raw
+    a[runs_off:runs_off + len(run_raw)] = run_raw
+    return bytes(a)
+
+
+def std_info(node, flags):
+    t_c = local_filetime(node.ctime)
+    t_m = local_filetime(node.mtime)
+    return struct.pack("<QQQQIIIIIIQQ", t_c, t_m, t_m, t_m, flags, 0, 0, 0, 0, 0, 0, 0)
+
+
+def file_name_attr(parent, node, name, flags):
+    raw = name.encode("utf-16le")
+    t_c = local_filetime(node.ctime)
+    t_m = local_filetime(node.mtime)
+    body = struct.pack("<QQQQQQQII", parent | (1 << 48), t_c, t_m, t_m, t_m,
+                       node.size, node.size, flags, 0)
+    body += bytes([len(name), 3]) + raw
+    return attr_resident(0x30, body)
+
+
+def mft_record(number, flags, attrs, record_size, fixups, sequence=1):
+    r = bytearray(record_size)
+    n_sectors = record_size // SECTOR
+    r[0:4] = b"FILE"
+    struct.pack_into("<HHQHHHH", r, 4, 0x30, n_sectors + 1, 0, sequence, 1, 0x38, flags)
+    offset = 0x38
+    for a in attrs:
+        r[offset:offset + len(a)] = a
+        offset += len(a)
+    r[offset:offset + 4] = b"\xff\xff\xff\xff"
+    offset += 8
+    struct.pack_into("<II", r, 0x18, offset, record_size)
+    struct.pack_into("<I", r, 0x2C, number)
+    if offset > record_size:
+        raise ValueError("Record overflow")
+    if fixups:
+        usn = b"\x01\x00"
+        r[0x30:0x32] = usn
+        for i in range(n_sectors):
+            end = (i + 1) * SECTOR
+            r[0x32 + 2 * i:0x34 + 2 * i] = r[end - 2:end]
+            r[end - 2:end] = usn
+    return bytes(r)
+
+
+def runs_of(clusters):
+    runs = []
+    for c in clusters:
+        if runs and runs[-1][0] + runs[-1][1] == c:
+            runs[-1][1] += 1
+        else:
+            runs.append([c, 1])
+    return [tuple(r) for r in runs]
+
+
+def compress_units(content, cluster_bytes, unit=16):
+    """Chia nội dung thành đơn vị nén NTFS: trả về [(dữ liệu lưu trên đĩa, số cluster thật, số cluster sparse)]
+
+    Đơn vị toàn 0 thành sparse; đơn vị nén LZNT1 tiết kiệm được cluster thì lưu bản nén
+    và bù sparse cho đủ đơn vị; còn lại lưu nguyên.
+    """
+    units = []
+    unit_bytes = unit * cluster_bytes
+    for start in range(0, len(content), unit_bytes):
+        data = content[start:start + unit_bytes]
+        clusters = -(-len(data) // cluster_bytes)
+        if not any(data):
+            units.append((b"", 0, unit))
+            continue
+        packed = lznt1.compress(data)
+        need = -(-len(packed) // cluster_bytes)
+        if need < clusters:
+            units.append((packed, need, unit - need))
+        else:
+            units.append((data, clusters, 0))
+    return units
+
+
+def build_ntfs(path, root, sectors_per_cluster=8, label="SYNTHNTFS", fragmentation=0.0, rng=None,
+               resident_limit=600, fixups=True, slack=1.25, compressed=0.0, ads=0.0):
+    rng = rng or random.Random(0)
+    cluster_bytes = SECTOR * sectors_per_cluster
+    record_size = 1024
+    nodes = [n for n in iter_nodes(root) if n is not root]
+    n_records = 24 + len(nodes)
+    n_records += (-n_records) % (cluster_bytes // record_size)
+    mft_clusters = n_records * record_size // cluster_bytes
+    data_clusters = sum(-(-n.size // cluster_bytes) for n in nodes if not n.is_dir and n.size > resident_limit)
+    data_clusters += int(ads * len(nodes) * 3)
+    n_clusters = int((data_clusters + mft_clusters) * slack) + 64
+    bitmap_clusters = -(-n_clusters // 8 // cluster_bytes) or 1
+    n_clusters += bitmap_clusters
+    total_sectors = n_clusters * sectors_per_cluster
+
+    used = bytearray(n_clusters)
+    mft_lcn = 4
+    for c in range(0, mft_lcn):
+        used[c] = 1
+    for c in range(mft_lcn, mft_lcn + mft_clusters):
+        used[c] = 1
+    mirr_lcn = mft_lcn + mft_clusters
+    used[mirr_lcn] = 1
+    bitmap_lcn = mirr_lcn + 1
+    for c in range(bitmap_lcn, bitmap_lcn + bitmap_clusters):
+        used[c] = 1
+    alloc = Allocator(bitmap_lcn + bitmap_clusters, n_clusters - bitmap_lcn - bitmap_clusters, fragmentation, rng)
+
+    numbers = {id(root): 5}
+    for i, node in enumerate(nodes):
+        numbers[id(node)] = 24 + i
+        if not node.is_dir and node.size > resident_limit:
+            if compressed and rng.random() < compressed:
+                # File nén: mỗi đơn vị 16 cluster gồm các cluster thật rồi tới run sparse
+                node.runs = []
+                stored = bytearray()
+                for data, real, sparse in compress_units(node.content, cluster_bytes):
+                    clusters = alloc.allocate(real)
+                    node.clusters += clusters
+                    node.runs += runs_of(clusters)
+                    if sparse:
+                        if node.runs and node.runs[-1][0] is None:
+                            node.runs[-1] = (None, node.runs[-1][1] + sparse)
+                        else:
+                            node.runs.append((None, sparse))
+                    stored += data.ljust(real * cluster_bytes, b"\x00")
+                node.stored = bytes(stored)
+            else:
+                node.clusters = alloc.allocate(-(-node.size // cluster_bytes))
+            if not node.deleted:
+                for c in node.clusters:
+                    used[c] = 1
+        if not node.is_dir and ads and rng.random() < ads:
+            # Alternate Data Stream: Zone.Identifier resident hoặc stream ẩn non-resident
+            if rng.random() < 0.5:
+                node.streams.append(("Zone.Identifier", b"[ZoneTransfer]\r\nZoneId=3\r\n", []))
+            else:
+                content = rng.randbytes(rng.randint(2000, 10000))
+                clusters = alloc.allocate(-(-len(content) // cluster_bytes))
+                node.streams.append(("hidden", content, clusters))
+                if not node.deleted:
+                    for c in clusters:
+                        used[c] = 1
+
+    bitmap = bytearray(bitmap_clusters * cluster_bytes)
+    for c in range(n_clusters):
+        if used[c]:
+            bitmap[c >> 3] |= 1 << (c & 7)
+
+    def system_node(name):
+        n = Node(name, False)
+        n.mtime = n.ctime = EPOCH_START
+        return n
+
+    with open(path, "wb") as f:
+        f.truncate(total_sectors * SECTOR)
+        boot = bytearray(SECTOR)
+        boot[0:3] = b"\xEB\x52\x90"
+        boot[3:11] = b"NTFS    "
+        struct.pack_into("<HBH", boot, 0x0B, SECTOR, sectors_per_cluster, 0)
+        boot[0x15] = 0xF8
+        struct.pack_into("<qqq", boot, 0x28, total_sectors - 1, mft_lcn, mirr_lcn)
+        struct.pack_into("<bxxxbxxxQ", boot, 0x40, -10, 1, rng.getrandbits(64))
+        boot[510:512] = b"\x55\xAA"
+        f.write(boot)
+
+        def write_record(number, raw):
+            f.seek(mft_lcn * cluster_bytes + number * record_size)
+            f.write(raw)
+
+        def system_record(number, name, extra, flags=1):
+            node = system_node(name)
+            attrs = [attr_resident(0x10, std_info(node, 0x06)),
+                     file_name_attr(5, node, name, 0x06)] + extra
+            write_record(number, mft_record(number, flags, attrs, record_size, fixups))
+
+        system_record(0, "$MFT", [attr_nonresident(0x80, [(mft_lcn, mft_clusters)], n_records * record_size, cluster_bytes)])
+        system_record(1, "$MFTMirr", [attr_nonresident(0x80, [(mirr_lcn, 1)], cluster_bytes, cluster_bytes)])
+        system_record(2, "$LogFile", [attr_resident(0x80, b"")])
+        volume_info = struct.pack("<QBBH", 0, 3, 1, 0)
+        system_record(3, "$Volume", [attr_resident(0x60, label.encode("utf-16le")),
+                                     attr_resident(0x70, volume_info),
+                                     attr_resident(0x80, b"")])
+        system_record(4, "$AttrDef", [attr_resident(0x80, b"")])
+        root_node = root
+        root_attrs = [attr_resident(0x10, std_info(root_node, 0x06)),
+                      file_name_attr(5, root_node, ".", 0x10000006),
+                      attr_resident(0x90, bytes(0x30), "$I30")]
+        write_record(5, mft_record(5, 3, root_attrs, record_size, fixups))
+        system_record(6, "$Bitmap", [attr_nonresident(0x80, [(bitmap_lcn, bitmap_clusters)], (n_clusters + 7) // 8, cluster_bytes)])
+        system_record(7, "$Boot", [attr_nonresident(0x80, [(0, 1)], SECTOR, cluster_bytes)])
+        system_record(8, "$BadClus", [attr_resident(0x80, b"")])
+        system_record(9, "$Secure", [attr_resident(0x80, b"")])
+        system_record(10, "$UpCase", [attr_resident(0x80, b"")])
+        system_record(11, "$Extend", [attr_resident(0x90, bytes(0x30), "$I30")], flags=3)
+
+        for node in nodes:
+            number = numbers[id(node)]
+            parent = numbers[id(node.parent)]
+            si_flags = 0x20 if not node.is_dir else 0
+            attrs = [attr_resident(0x10, std_info(node, si_flags)),
+                     file_name_attr(parent, node, node.name, 0x10000000 if node.is_dir else 0x20)]
+            if node.is_dir:
+                attrs.append(attr_resident(0x90, bytes(0x30), "$I30"))
+                flags = 3
+            elif node.runs is not None:
+                attrs.append(attr_nonresident(0x80, node.runs, node.size, cluster_bytes, flags=0x0001, unit=4))
+                flags = 1
+            elif node.clusters:
+                attrs.append(attr_nonresident(0x80, runs_of(node.clusters), node.size, cluster_bytes))
+                flags = 1
+            else:
+                attrs.append(attr_resident(0x80, node.content))
+                flags = 1
+            for name, content, clusters in node.streams:
+                if clusters:
+                    attrs.append(attr_nonresident(0x80, runs_of(clusters), len(content), cluster_bytes, name=name))
+                    for i, c in enumerate(clusters):
+                        f.seek(c * cluster_bytes)
+                        f.write(content[i * cluster_bytes:(i + 1) * cluster_bytes])
+                else:
+                    attrs.append(attr_resident(0x80, content, name))
+            if node.deleted:
+                flags &= ~1
+            write_record(number, mft_record(number, flags, attrs, record_size, fixups))
+            stored = node.stored if node.runs is not None else node.content
+            for i, c in enumerate(node.clusters):
+                chunk = stored[i * cluster_bytes:(i + 1) * cluster_bytes]
+                f.seek(c * cluster_bytes)
+                f.write(chunk)
+
+        f.seek(bitmap_lcn * cluster_bytes)
+        f.write(bitmap)
+    return path
+
+
+def build_disk(path, volumes, scheme="mbr", align=2048):
+    """Ghép các ảnh volume thành một ảnh toàn đĩa có bảng phân vùng MBR hoặc GPT.
+
+    volumes: danh sách đường dẫn ảnh volume (FAT32/NTFS); mỗi phân vùng được căn
+    theo `align` sector. Với MBR, từ phân vùng thứ 4 trở đi nằm trong phân vùng mở rộng.
+    """
+    layout = []
+    lba = align
+    for image in volumes:
+        with open(image, "rb") as f:
+            boot = f.read(SECTOR)
+            size = f.seek(0, 2)
+        count = -(-size // SECTOR)
+        kind = 0x0C if boot[0x52:0x5A] == b"FAT32   " else 0x07
+        if scheme == "mbr" and len(volumes) > 4 and len(layout) >= 3:
+            lba += align  # chừa chỗ cho EBR trước mỗi phân vùng logic
+        layout.append((image, kind, lba, count))
+        lba = -(-(lba + count) // align) * align
+    total = lba + (34 if scheme == "gpt" else 0)
+
+    with open(path, "wb") as f:
+        f.truncate(total * SECTOR)
+        for image, _, start, _ in layout:
+            f.seek(start * SECTOR)
+            with open(image, "rb") as src:
+                shutil.copyfileobj(src, f, 1 << 20)
+
+        def mbr_entry(kind, start, count):
+            return struct.pack("<B3sB3sII", 0, b"\xfe\xff\xff", kind, b"\xfe\xff\xff", start, count)
+
+        def write_table(lba, entries):
+            f.seek(lba * SECTOR + 0x1BE)
+            f.write(b"".join(entries).ljust(64, b"\x00") + b"\x55\xaa")
+
+        if scheme == "gpt":
+            write_table(0, [mbr_entry(0xEE, 1, min(total - 1, 0xFFFFFFFF))])
+            basic = uuid.UUID("EBD0A0A2-B9E5-4433-87C0-68B6B72699C7").bytes_le
+            table = b"".join(
+                basic + uuid.UUID(int=random.getrandbits(128)).bytes_le
+                + struct.pack("<QQQ", start, start + count - 1, 0)
+                + ("Volume %d" % (i + 1)).encode("utf-16-le").ljust(72, b"\x00")
+                for i, (_, _, start, count) in enumerate(layout)).ljust(128 * 128, b"\x00")
+
+            def gpt_header(current, backup, entries_lba):
+                header = struct.pack("<8sIIIIQQQQ16sQIII", b"EFI PART", 0x10000, 92, 0, 0, current, backup,
+                                     34, total - 34, uuid.UUID(int=random.getrandbits(128)).bytes_le,
+                                     entries_lba, 128, 128, zlib.crc32(table))
+                return header[:16] + struct.pack("<I", zlib.crc32(header)) + header[20:]
+
+            f.seek(SECTOR)
+            f.write(gpt_header(1, total - 1, 2).ljust(SECTOR, b"\x00"))
+            f.write(table)
+            f.seek((total - 33) * SECTOR)
+            f.write(table)
+            f.write(gpt_header(total - 1, 1, total - 33).ljust(SECTOR, b"\x00"))
+            return
+
+        primary = [mbr_entry(kind, start, count) for _, kind, start, count in layout[:4]]
+        if len(layout) > 4:
+            logical = layout[3:]
+            ext_start = logical[0][2] - align
+            ext_end = logical[-1][2] + logical[-1][3]
+            primary = primary[:3] + [mbr_entry(0x0F, ext_start, ext_end - ext_start)]
+            for i, (_, kind, start, count) in enumerate(logical):
+                ebr = start - align
+                entries = [mbr_entry(kind, align, count)]
+                if i + 1 < len(logical):
+                    next_ebr = logical[i + 1][2] - align
+                    entries.append(mbr_entry(0x05, next_ebr - ext_start, logical[i + 1][3] + align))
+                write_table(ebr, entries)
+        write_table(0, primary)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sinh ảnh đĩa FAT32/NTFS tổng hợp")
+    parser.add_argument("fs", choices=["fat32", "ntfs"])
+    parser.add_argument("output")
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--fanout", type=int, default=4)
+    parser.add_argument("--files-per-dir", type=int, default=50)
+    parser.add_argument("--name-len", type=int, default=20)
+    parser.add_argument("--no-lfn", action="store_true")
+    parser.add_argument("--fragmentation", type=float, default=0.0)
+    parser.add_argument("--min-size", type=int, default=0)
+    parser.add_argument("--max-size", type=int, default=64 * 1024)
+    parser.add_argument("--deleted", type=float, default=0.0)
+    parser.add_argument("--compressed", type=float, default=0.0, help="Tỉ lệ file NTFS được nén LZNT1")
+    parser.add_argument("--ads", type=float, default=0.0, help="Tỉ lệ file NTFS có Alternate Data Stream")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    root = build_tree(args.files, args.fanout, args.files_per_dir, args.name_len, not args.no_lfn,
+                      args.min_size, args.max_size, args.deleted, rng)
+    if args.fs == "fat32":
+        build_fat32(args.output, root, fragmentation=args.fragmentation, rng=rng)
+    else:
+        build_ntfs(args.output, root, fragmentation=args.fragmentation, rng=rng, compressed=args.compressed, ads=args.ads)
+
+
+if __name__ == "__main__":
+    main()
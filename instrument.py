@@ -0,0 +1,166 @@
+import io
+import os
+import time
+import cProfile
+import pstats
+import tracemalloc
+from contextlib import contextmanager
+
+# Tắt mặc định: khi tắt, wrap() trả lại nguyên file object và phase() không đo gì
+enabled = False
+
+
+class Stats:
+    """Bộ đếm I/O, cache và thời gian theo từng giai đoạn"""
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self):
+        self.bytes_read = 0
+        self.reads = 0
+        self.seeks = 0
+        self.seek_distance = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.phases: dict[str, list] = {}
+
+    def as_dict(self) -> dict:
+        return {
+            "Bytes read": self.bytes_read,
+            "Read syscalls": self.reads,
+            "Seek syscalls": self.seeks,
+            "Seek distance": self.seek_distance,
+            "Cache hits": self.cache_hits,
+            "Cache misses": self.cache_misses,
+            "Phases": {name: {"Count": count, "Seconds": seconds} for name, (count, seconds) in self.phases.items()},
+        }
+
+    def report(self) -> str:
+        lines = [f"{k}: {v}" for k, v in self.as_dict().items() if k != "Phases"]
+        for name, (count, seconds) in sorted(self.phases.items(), key=lambda item: -item[1][1]):
+            lines.append(f"  {name:20} {count:8d} x {seconds * 1000:10.3f} ms")
+        return "\n".join(lines)
+
+
+STATS = Stats()
+
+
+def enable(reset=True):
+    global enabled
+    enabled = True
+    if reset:
+        STATS.reset()
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+class InstrumentedFile:
+    """Bọc file object của thiết bị để đếm syscall đọc/seek, số byte và quãng seek"""
+    def __init__(self, fd) -> None:
+        self.fd = fd
+        self.name = fd.name
+        self.pos = fd.tell()
+
+    def seek(self, offset, whence=0):
+        new_pos = self.fd.seek(offset, whence)
+        STATS.seeks += 1
+        STATS.seek_distance += abs(new_pos - self.pos)
+        self.pos = new_pos
+        return new_pos
+
+    def read(self, size=-1):
+        data = self.fd.read(size)
+        STATS.reads += 1
+        STATS.bytes_read += len(data)
+        self.pos += len(data)
+        return data
+
+    if hasattr(os, "pread"):
+        def pread(self, size, offset):
+            # Đọc theo vị trí: một syscall, không có seek riêng nhưng vẫn tính quãng nhảy
+            data = os.pread(self.fd.fileno(), size, offset)
+            STATS.reads += 1
+            STATS.bytes_read += len(data)
+            STATS.seek_distance += abs(offset - self.pos)
+            self.pos = offset + len(data)
+            return data
+
+    def tell(self):
+        return self.pos
+
+    def fileno(self):
+        return self.fd.fileno()
+
+    def close(self):
+        self.fd.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def wrap(fd):
+    return InstrumentedFile(fd) if enabled else fd
+
+
+def cache_hit():
+    STATS.cache_hits += 1
+
+
+def cache_miss():
+    STATS.cache_misses += 1
+
+
+@contextmanager
+def phase(name):
+    """Cộng dồn số lần và thời gian của một giai đoạn (boot sector, FAT load, MFT scan...)"""
+    if not enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        entry = STATS.phases.setdefault(name, [0, 0.0])
+        entry[0] += 1
+        entry[1] += time.perf_counter() - start
+
+
+def profile(func, *args, mode="cprofile", out=None, top=30, **kwargs):
+    """Chạy func(*args, **kwargs) dưới cProfile hoặc tracemalloc rồi ghi báo cáo.
+
+    Báo cáo được ghi vào file `out` (nếu có) hoặc in ra màn hình; trả về kết quả của func.
+    """
+    buf = io.StringIO()
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+        result = profiler.runcall(func, *args, **kwargs)
+        pstats.Stats(profiler, stream=buf).sort_stats("cumulative").print_stats(top)
+    elif mode == "tracemalloc":
+        already = tracemalloc.is_tracing()
+        if not already:
+            tracemalloc.start()
+        try:
+            result = func(*args, **kwargs)
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            if not already:
+                tracemalloc.stop()
+        buf.write(f"Current: {current / (1 << 20):.2f} MB, peak: {peak / (1 << 20):.2f} MB\n")
+        for stat in snapshot.statistics("lineno")[:top]:
+            buf.write(f"{stat}\n")
+    else:
+        raise ValueError(f"Unknown profile mode '{mode}'")
+
+    if out:
+        with open(out, "w") as f:
+            f.write(buf.getvalue())
+    else:
+        print(buf.getvalue())
+    return result
@@ -0,0 +1,122 @@
+CHUNK = 4096
+# Số bit dành cho độ dài trong token back-reference, theo vị trí (đã giải nén) trong chunk:
+# vị trí càng xa thì offset càng cần nhiều bit, độ dài càng ít bit (12 -> 4)
+LENGTH_BITS = [12 - max(0, (pos - 1).bit_length() - 4) for pos in range(CHUNK + 1)]
+
+
+def decompress_chunk(data, pos, end, out: bytearray):
+    """Giải nén một chunk LZNT1 data[pos:end] và nối vào cuối out"""
+    base = len(out)
+    while pos < end:
+        flags = data[pos]
+        pos += 1
+        if flags == 0:
+            # 8 literal liên tiếp: chép một lượt
+            out += data[pos:min(pos + 8, end)]
+            pos += 8
+            continue
+        bit = 0
+        while bit < 8 and pos < end:
+            rest = flags >> bit
+            if not rest & 1:
+                # Chép một lượt các literal liên tiếp (số bit 0 thấp nhất của phần flag còn lại)
+                count = (rest & -rest).bit_length() - 1 if rest else 8 - bit
+                out += data[pos:min(pos + count, end)]
+                pos += count
+                bit += count
+                continue
+            bit += 1
+            token = data[pos] | data[pos + 1] << 8
+            pos += 2
+            shift = LENGTH_BITS[len(out) - base]
+            length = (token & ((1 << shift) - 1)) + 3
+            disp = (token >> shift) + 1
+            start = len(out) - disp
+            if start < base:
+                raise ValueError("Invalid LZNT1 back-reference")
+            if disp >= length:
+                out += out[start:start + length]
+            else:
+                # Tham chiếu chồng lên chính phần đang chép: lặp lại mẫu disp byte
+                pattern = out[start:]
+                out += (pattern * (length // disp + 1))[:length]
+
+
+def decompress(data, out_size=None) -> bytes:
+    """Giải nén dữ liệu LZNT1 (một đơn vị nén của NTFS) thành tối đa out_size byte.
+
+    Mỗi chunk biểu diễn 4 KB đầu ra; chunk giải nén ra ít hơn được bù 0 trước chunk kế
+    tiếp. Đầu ra được nối vào một bytearray (out += nhanh hơn ghi đè theo chỉ số vào
+    buffer cấp sẵn với mỗi token) và chỉ được chép ra bytes một lần ở cuối.
+    """
+    out = bytearray()
+    data = memoryview(data)
+    pos = 0
+    n = len(data)
+    while pos + 2 <= n:
+        header = data[pos] | data[pos + 1] << 8
+        if header == 0:
+            break
+        end = min(pos + 3 + (header & 0xFFF), n)
+        pos += 2
+        if len(out) % CHUNK:
+            out += bytes(CHUNK - len(out) % CHUNK)
+        if header & 0x8000:
+            decompress_chunk(data, pos, end, out)
+        else:
+            out += data[pos:end]
+        pos = end
+        if out_size is not None and len(out) >= out_size:
+            break
+    if out_size is not None:
+        if len(out) < out_size:
+            out += bytes(out_size - len(out))
+        del out[out_size:]
+    return bytes(out)
+
+
+def compress_chunk(chunk: bytes) -> bytes:
+    # Nén tham lam với bảng băm 3 byte (dùng để sinh ảnh thử nghiệm, không tối ưu tỉ lệ nén)
+    out = bytearray()
+    last = {}
+    pos = 0
+    n = len(chunk)
+    while pos < n:
+        flag_pos = len(out)
+        out.append(0)
+        flags = 0
+        for bit in range(8):
+            if pos >= n:
+                break
+            match = 0
+            cand = last.get(chunk[pos:pos + 3]) if pos + 3 <= n else None
+            shift = LENGTH_BITS[pos]
+            if cand is not None and pos - cand <= 1 << (16 - shift):
+                max_len = min((1 << shift) + 2, n - pos)
+                match = 3
+                while match < max_len and chunk[cand + match] == chunk[pos + match]:
+                    match += 1
+            step = match if match >= 3 else 1
+            if step > 1:
+                out += (((pos - cand - 1) << shift) | (match - 3)).to_bytes(2, 'little')
+                flags |= 1 << bit
+            else:
+                out.append(chunk[pos])
+            for k in range(pos, min(pos + step, n - 2)):
+                last[chunk[k:k + 3]] = k
+            pos += step
+        out[flag_pos] = flags
+    return bytes(out)
+
+
+def compress(data: bytes) -> bytes:
+    """Nén dữ liệu thành luồng chunk LZNT1; chunk không nén được lưu nguyên"""
+    out = bytearray()
+    for start in range(0, len(data), CHUNK):
+        chunk = data[start:start + CHUNK]
+        packed = compress_chunk(chunk)
+        if len(packed) < len(chunk):
+            out += (0xB000 | (len(packed) - 1)).to_bytes(2, 'little') + packed
+        else:
+            out += (0x3000 | (len(chunk) - 1)).to_bytes(2, 'little') + chunk
+    return bytes(out)
@@ -0,0 +1,216 @@
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import instrument
+from device import BlockDevice, PartitionView, device_path
+from FAT32 import FAT32
+from NTFS import NTFS
+
+SECTOR = 512
+EXTENDED_TYPES = (0x05, 0x0F, 0x85)
+GPT_PROTECTIVE = 0xEE
+MBR_TYPES = {
+    0x07: "NTFS/exFAT",
+    0x0B: "FAT32 (CHS)",
+    0x0C: "FAT32 (LBA)",
+    0x0E: "FAT16 (LBA)",
+    0x27: "Windows recovery",
+    0x82: "Linux swap",
+    0x83: "Linux",
+}
+GPT_TYPES = {
+    "EBD0A0A2-B9E5-4433-87C0-68B6B72699C7": "Microsoft basic data",
+    "C12A7328-F81F-11D2-BA4B-00A0C93EC93B": "EFI system",
+    "E3C9E316-0B5C-4DB8-817D-F92DF00215AE": "Microsoft reserved",
+    "DE94BBA4-06D1-4D40-A16A-BFD50179D6AC": "Windows recovery",
+    "0FC63DAF-8483-4772-8E79-3D69D8477DE4": "Linux filesystem",
+}
+
+
+def cpu_count() -> int:
+    # Số CPU process được phép chạy (tôn trọng affinity/cgroup nếu có), khác os.cpu_count() là số CPU của máy
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def partition(index, scheme, kind, start, size, name=""):
+    return {"Index": index, "Scheme": scheme, "Type": kind, "Start": start, "Size": size, "Name": name}
+
+
+def parse_mbr_entries(sector: bytes) -> 'list[tuple[int, int, int]]':
+    # 4 entry của bảng phân vùng (loại, LBA đầu, số sector); rỗng nếu thiếu chữ ký 0x55AA
+    if len(sector) < SECTOR or sector[510:512] != b"\x55\xaa":
+        return []
+    entries = []
+    for i in range(4):
+        entry = sector[0x1BE + 16 * i:0x1BE + 16 * (i + 1)]
+        kind = entry[4]
+        lba = int.from_bytes(entry[8:12], 'little')
+        count = int.from_bytes(entry[12:16], 'little')
+        if kind and count:
+            entries.append((kind, lba, count))
+    return entries
+
+
+def read_ebr_chain(dev, ext_lba, max_logical=128) -> 'list[tuple[int, int, int]]':
+    # Phân vùng logic trong phân vùng mở rộng: mỗi EBR chứa 1 phân vùng (LBA tính từ EBR đó)
+    # và liên kết tới EBR kế tiếp (LBA tính từ đầu phân vùng mở rộng)
+    logical = []
+    seen = set()
+    ebr = ext_lba
+    while ebr not in seen and len(logical) < max_logical:
+        seen.add(ebr)
+        entries = parse_mbr_entries(dev.read_at(ebr * SECTOR, SECTOR))
+        if not entries:
+            break
+        next_ebr = None
+        for kind, lba, count in entries[:2]:
+            if kind in EXTENDED_TYPES:
+                next_ebr = ext_lba + lba
+            else:
+                logical.append((kind, ebr + lba, count))
+        if next_ebr is None:
+            break
+        ebr = next_ebr
+    return logical
+
+
+def read_mbr(dev) -> 'list[dict]':
+    parts = []
+    for kind, lba, count in parse_mbr_entries(dev.read_at(0, SECTOR)):
+        found = read_ebr_chain(dev, lba) if kind in EXTENDED_TYPES else [(kind, lba, count)]
+        for kind, lba, count in found:
+            parts.append(partition(len(parts) + 1, "MBR", MBR_TYPES.get(kind, "0x%02X" % kind),
+                                   lba * SECTOR, count * SECTOR))
+    return parts
+
+
+def read_gpt(dev, sector_size=SECTOR):
+    """Đọc bảng phân vùng GPT (header tại LBA 1); None nếu không có header hợp lệ"""
+    header = dev.read_at(sector_size, 92)
+    if header[:8] != b"EFI PART":
+        return None
+    entries_lba = int.from_bytes(header[72:80], 'little')
+    count = int.from_bytes(header[80:84], 'little')
+    entry_size = int.from_bytes(header[84:88], 'little')
+    if entry_size < 128 or count > 1024:
+        return None
+    table = dev.read_at(entries_lba * sector_size, count * entry_size)
+    parts = []
+    for i in range(count):
+        entry = table[i * entry_size:(i + 1) * entry_size]
+        if len(entry) < 128 or not any(entry[:16]):
+            continue
+        type_guid = str(uuid.UUID(bytes_le=bytes(entry[:16]))).upper()
+        first = int.from_bytes(entry[32:40], 'little')
+        last = int.from_bytes(entry[40:48], 'little')
+        name = bytes(entry[56:128]).decode('utf-16-le', errors='replace').split('\x00')[0]
+        parts.append(partition(len(parts) + 1, "GPT", GPT_TYPES.get(type_guid, type_guid),
+                               first * sector_size, (last - first + 1) * sector_size, name))
+    return parts
+
+
+def detect_file_system(boot_sector: bytes):
+    if FAT32.is_fat32_boot(boot_sector):
+        return "FAT32"
+    if NTFS.is_ntfs_boot(boot_sector):
+        return "NTFS"
+    return None
+
+
+def list_partitions(dev) -> 'list[dict]':
+    """Danh sách phân vùng của thiết bị (MBR, kể cả phân vùng logic, hoặc GPT).
+
+    Thiết bị không có bảng phân vùng nhưng bản thân là một volume FAT32/NTFS được
+    coi là một phân vùng duy nhất bắt đầu từ byte 0.
+    """
+    boot = dev.read_at(0, SECTOR)
+    if detect_file_system(boot):
+        return [partition(0, "None", "Volume", 0, dev.size)]
+    entries = parse_mbr_entries(boot)
+    if any(kind == GPT_PROTECTIVE for kind, _, _ in entries):
+        for sector_size in (SECTOR, 4096):
+            parts = read_gpt(dev, sector_size)
+            if parts is not None:
+                return parts
+    return read_mbr(dev)
+
+
+class Disk:
+    """Ổ đĩa vật lý hoặc ảnh toàn đĩa nhiều phân vùng.
+
+    Thiết bị chỉ được mở một lần; bảng phân vùng được đọc và mỗi phân vùng được
+    nhận dạng từ boot sector qua cùng BlockDevice (không mở lại để dò). Các volume
+    được khởi tạo song song trên các PartitionView dùng chung thiết bị đó; phần parse
+    MFT của NTFS chạy trong process pool (xem open_volumes).
+    """
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.fd = instrument.wrap(open(device_path(name), 'rb'))
+        self.dev = BlockDevice(self.fd)
+        self.partitions = list_partitions(self.dev)
+        for part in self.partitions:
+            part["File system"] = detect_file_system(self.dev.read_at(part["Start"], SECTOR))
+
+    def open_volume(self, part: dict, workers=None):
+        # workers: số process parse MFT cho phân vùng NTFS (None: tuần tự)
+        view = PartitionView(self.dev, part["Start"], part["Size"])
+        name = "%s#%d" % (self.name, part["Index"])
+        if part["File system"] == "NTFS":
+            return NTFS(name, device=view, workers=workers)
+        if part["File system"] == "FAT32":
+            return FAT32(name, device=view)
+        raise ValueError(f"Unsupported file system on partition {part['Index']}")
+
+    def open_volumes(self, max_workers=None, workers=None) -> 'list[tuple[dict, object]]':
+        """Khởi tạo song song mọi phân vùng FAT32/NTFS; trả về [(phân vùng, volume)] theo thứ tự bảng.
+
+        Khởi tạo volume phần lớn là parse bằng Python (giữ GIL), nên thread chỉ chồng được
+        phần I/O. Phần nặng nhất, parse MFT của mỗi phân vùng NTFS, được đưa sang process pool
+        riêng với `workers` process (mặc định chia đều số CPU, tối thiểu 2) để thời gian mở
+        gần bằng phân vùng chậm nhất thay vì tổng các phân vùng. FAT32 chỉ nạp bảng FAT
+        (frombytes, chạy trong C) và thư mục gốc nên không cần process.
+        """
+        parts = [part for part in self.partitions if part["File system"]]
+        if not parts:
+            return []
+        ntfs_count = sum(part["File system"] == "NTFS" for part in parts)
+        if workers is None and ntfs_count:
+            cpus = cpu_count()
+            workers = max(2, cpus // ntfs_count) if cpus > 1 else None
+        with ThreadPoolExecutor(max_workers=max_workers or len(parts)) as pool:
+            return list(zip(parts, pool.map(lambda part: self.open_volume(part, workers), parts)))
+
+    def close(self):
+        self.dev.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __str__(self) -> str:
+        s = f"Disk: {self.name}\n"
+        for part in self.partitions:
+            s += "%d: %s %s start=%d size=%s %s %s\n" % (
+                part["Index"], part["Scheme"], part["Type"], part["Start"], part["Size"],
+                part["File system"] or "-", part["Name"])
+        return s
+
+
+def open_volume(name: str, partition=None):
+    """Mở volume (tự nhận dạng FAT32/NTFS) hoặc phân vùng thứ partition của ảnh đĩa"""
+    if partition is not None:
+        disk = Disk(name)
+        for part in disk.partitions:
+            if part["Index"] == partition:
+                return disk.open_volume(part)
+        raise ValueError(f"No partition {partition} on {name}")
+    if FAT32.is_fat32(name):
+        return FAT32(name)
+    if NTFS.is_ntfs(name):
+        return NTFS(name)
+    raise ValueError(f"Unsupported file system on {name}")
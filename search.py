@@ -0,0 +1,145 @@
+import re
+import fnmatch
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+GLOB_CHARS = re.compile(r"[*?\[\]]")
+# Tách các đoạn ký tự cố định của glob (bỏ qua wildcard và nhóm [...])
+GLOB_TOKENS = re.compile(r"\[[^\]]*\]|[*?]")
+
+
+def trigrams(text: str):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def as_timestamp(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return float(value)
+
+
+class SearchIndex:
+    """Index tên và metadata của toàn bộ volume.
+
+    Gồm mảng tên đã casefold (sắp xếp, dùng cho truy vấn tiền tố), posting list
+    trigram (cho truy vấn chuỗi con/glob) và các cột kích thước, mtime đã sắp
+    xếp để truy vấn theo khoảng bằng tìm kiếm nhị phân.
+    """
+    def __init__(self, fs) -> None:
+        self.paths: list[str] = []
+        self.names: list[str] = []
+        self.sizes = array('q')
+        self.mtimes = array('d')
+        self.flags = array('I')
+        self.postings: dict[str, array] = {}
+        for info in fs.walk(from_root=True):
+            doc_id = len(self.paths)
+            name = info["Name"].casefold()
+            self.paths.append(info["Path"])
+            self.names.append(name)
+            self.sizes.append(info["Size"])
+            mtime = info["Date Modified"]
+            self.mtimes.append(mtime.timestamp() if mtime else 0.0)
+            self.flags.append(info["Flags"])
+            for gram in trigrams(name):
+                posting = self.postings.get(gram)
+                if posting is None:
+                    posting = self.postings[gram] = array('I')
+                posting.append(doc_id)
+
+        self.name_order = array('I', sorted(range(len(self.names)), key=self.names.__getitem__))
+        self.sorted_names = [self.names[i] for i in self.name_order]
+        self.size_order = array('I', sorted(range(len(self.sizes)), key=self.sizes.__getitem__))
+        self.sorted_sizes = array('q', (self.sizes[i] for i in self.size_order))
+        self.mtime_order = array('I', sorted(range(len(self.mtimes)), key=self.mtimes.__getitem__))
+        self.sorted_mtimes = array('d', (self.mtimes[i] for i in self.mtime_order))
+
+    def __len__(self):
+        return len(self.paths)
+
+    def name_candidates(self, pattern: str):
+        # Trả về (tập id ứng viên hoặc None = tất cả, regex kiểm tra cuối)
+        pattern = pattern.casefold()
+        if GLOB_CHARS.search(pattern):
+            regex = re.compile(fnmatch.translate(pattern))
+            literals = [part for part in GLOB_TOKENS.split(pattern) if part]
+            prefix = GLOB_TOKENS.split(pattern, 1)[0]
+        else:
+            regex = re.compile(".*" + re.escape(pattern) + ".*", re.S)
+            literals = [pattern]
+            prefix = ""
+
+        grams = set()
+        for literal in literals:
+            grams |= trigrams(literal)
+        if grams:
+            postings = sorted((self.postings.get(g, ()) for g in grams), key=len)
+            ids = set(postings[0])
+            for posting in postings[1:]:
+                if not ids:
+                    break
+                ids.intersection_update(posting)
+            return ids, regex
+        if prefix:
+            # Glob có tiền tố cố định nhưng quá ngắn cho trigram: dùng mảng tên đã sắp xếp
+            lo = bisect_left(self.sorted_names, prefix)
+            hi = bisect_left(self.sorted_names, prefix + "\U0010ffff")
+            return set(self.name_order[lo:hi]), regex
+        return None, regex
+
+    @staticmethod
+    def range_candidates(order, column, low, high):
+        lo = 0 if low is None else bisect_left(column, low)
+        hi = len(column) if high is None else bisect_right(column, high)
+        return set(order[lo:hi])
+
+    def find(self, pattern=None, size_range=None, mtime_range=None, attrs=None) -> 'list[dict]':
+        """Tìm file/thư mục theo tên (chuỗi con hoặc glob, không phân biệt hoa thường),
+        khoảng kích thước (min, max), khoảng mtime (datetime hoặc timestamp) và
+        cờ thuộc tính (int mask hoặc danh sách Flag)"""
+        candidate_sets = []
+        regex = None
+        if pattern:
+            ids, regex = self.name_candidates(pattern)
+            if ids is not None:
+                candidate_sets.append(ids)
+        if size_range is not None:
+            candidate_sets.append(self.range_candidates(self.size_order, self.sorted_sizes, *size_range))
+        if mtime_range is not None:
+            low, high = (as_timestamp(v) for v in mtime_range)
+            candidate_sets.append(self.range_candidates(self.mtime_order, self.sorted_mtimes, low, high))
+
+        if candidate_sets:
+            candidate_sets.sort(key=len)
+            ids = candidate_sets[0]
+            for other in candidate_sets[1:]:
+                ids = ids & other
+            ids = sorted(ids)
+        else:
+            ids = range(len(self.paths))
+
+        mask = 0
+        if isinstance(attrs, int):
+            mask = attrs
+        elif hasattr(attrs, "value"):
+            mask = attrs.value
+        elif attrs is not None:
+            mask = sum(a.value for a in attrs)
+
+        results = []
+        for i in ids:
+            if regex is not None and not regex.match(self.names[i]):
+                continue
+            if mask and self.flags[i] & mask != mask:
+                continue
+            results.append({
+                "Path": self.paths[i],
+                "Name": self.paths[i].rsplit("\\", 1)[-1],
+                "Size": self.sizes[i],
+                "Date Modified": datetime.fromtimestamp(self.mtimes[i]) if self.mtimes[i] else None,
+                "Flags": self.flags[i],
+            })
+        return results
@@ -0,0 +1,151 @@
+import math
+import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from carve import SIGNATURES
+from extract import first_cluster
+
+# Số byte đầu file được đọc để nhận dạng
+SNIFF_SIZE = 4096
+# Entropy (bit/byte) từ mức này trở lên mà không khớp chữ ký nào: nhiều khả năng là dữ liệu mã hóa/nén
+HIGH_ENTROPY = 7.5
+
+# (loại, vị trí, chữ ký, các phần mở rộng hợp lệ); chữ ký dài/cụ thể đặt trước chữ ký ngắn
+MAGIC = [
+    *((kind, 0, header, (kind,)) for kind, header, *_ in SIGNATURES),
+    ("gif", 0, b"GIF87a", ("gif",)),
+    ("gif", 0, b"GIF89a", ("gif",)),
+    ("webp", 8, b"WEBP", ("webp",)),
+    ("wav", 8, b"WAVE", ("wav",)),
+    ("avi", 8, b"AVI ", ("avi",)),
+    ("mp4", 4, b"ftyp", ("mp4", "m4a", "m4v", "mov", "3gp", "heic")),
+    ("mp3", 0, b"ID3", ("mp3",)),
+    ("ogg", 0, b"OggS", ("ogg", "oga", "ogv", "opus")),
+    ("flac", 0, b"fLaC", ("flac",)),
+    ("mkv", 0, b"\x1a\x45\xdf\xa3", ("mkv", "webm")),
+    ("tiff", 0, b"II*\x00", ("tif", "tiff")),
+    ("tiff", 0, b"MM\x00*", ("tif", "tiff")),
+    ("ico", 0, b"\x00\x00\x01\x00", ("ico",)),
+    ("ole", 0, b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", ("doc", "xls", "ppt", "msg", "msi")),
+    ("rar", 0, b"Rar!\x1a\x07", ("rar",)),
+    ("7z", 0, b"7z\xbc\xaf\x27\x1c", ("7z",)),
+    ("gz", 0, b"\x1f\x8b", ("gz", "tgz")),
+    ("bz2", 0, b"BZh", ("bz2", "tbz2")),
+    ("xz", 0, b"\xfd7zXZ\x00", ("xz", "txz")),
+    ("elf", 0, b"\x7fELF", ("", "so", "o", "elf")),
+    ("exe", 0, b"MZ", ("exe", "dll", "sys", "scr", "ocx", "cpl", "efi")),
+    ("lnk", 0, b"L\x00\x00\x00\x01\x14\x02\x00", ("lnk",)),
+    ("evtx", 0, b"ElfFile\x00", ("evtx",)),
+    ("registry", 0, b"regf", ("", "dat", "hve")),
+    ("bmp", 0, b"BM", ("bmp", "dib")),
+]
+# Phần mở rộng hợp lệ của mỗi loại (gộp các dòng cùng loại); loại lấy từ carve.SIGNATURES bổ sung ở đây
+EXTENSIONS = {
+    "jpg": {"jpeg", "jpe", "jfif"},
+    "zip": {"docx", "xlsx", "pptx", "odt", "ods", "jar", "apk", "epub"},
+    "sqlite": {"db", "sqlite3"},
+}
+for _kind, _offset, _magic, _extensions in MAGIC:
+    EXTENSIONS.setdefault(_kind, set()).update(_extensions)
+TEXT_EXTENSIONS = {"txt", "log", "csv", "ini", "cfg", "conf", "xml", "html", "htm", "json", "md", "py", "c",
+                   "h", "cpp", "js", "css", "bat", "cmd", "ps1", "sh", "reg", "inf", "rtf", "svg", "yml", "yaml"}
+
+
+def entropy(data: bytes) -> float:
+    # Entropy Shannon (bit/byte) của mẫu; Counter đếm tần suất trong C
+    if not data:
+        return 0.0
+    total = len(data)
+    return -sum(count / total * math.log2(count / total) for count in Counter(data).values())
+
+
+def looks_like_text(data: bytes) -> bool:
+    if b"\x00" in data:
+        # UTF-16 có BOM vẫn là văn bản
+        return data[:2] in (b"\xff\xfe", b"\xfe\xff")
+    try:
+        data.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # Mẫu có thể cắt ngang một ký tự nhiều byte ở cuối
+        return e.start >= len(data) - 3 and e.reason == "unexpected end of data"
+    return True
+
+
+def classify(head: bytes) -> 'tuple[str, float]':
+    """(loại, entropy) của phần đầu file: khớp bảng MAGIC, nếu không thì đoán văn bản/dữ liệu ngẫu nhiên"""
+    score = entropy(head)
+    for kind, offset, magic, _ in MAGIC:
+        if head.startswith(magic, offset):
+            return kind, score
+    if looks_like_text(head):
+        return "text", score
+    if score >= HIGH_ENTROPY:
+        return "encrypted/compressed", score
+    return "data", score
+
+
+def extension_matches(path: str, kind: str) -> bool:
+    extension = os.path.splitext(path.rsplit("\\", 1)[-1])[1][1:].lower()
+    if kind == "text":
+        return extension in TEXT_EXTENSIONS or extension == ""
+    if kind in EXTENSIONS:
+        return extension in EXTENSIONS[kind]
+    # Không nhận dạng được thì không kết luận
+    return True
+
+
+def sniff_types(fs, path="", max_workers=4) -> 'tuple[list, dict]':
+    """Nhận dạng loại file dưới `path` (mặc định cả volume, kể cả file hidden/system) theo nội
+    dung thay vì phần mở rộng.
+
+    Đọc SNIFF_SIZE byte đầu của mỗi file theo thứ tự cluster vật lý đầu tiên (thread pool,
+    pool.map giữ thứ tự nên các lần đọc đi gần như tuần tự trên đĩa), khớp bảng MAGIC và ước
+    lượng entropy. Kết quả được nhớ trong fs.sniff_cache theo (đường dẫn, kích thước, cluster
+    đầu), lần gọi sau chỉ đọc các file chưa có trong cache.
+    Trả về (danh sách kết quả theo đường dẫn, thống kê).
+    """
+    start_time = time.perf_counter()
+    files = [info for info in fs.walk(path, from_root=not path, include_hidden=True)
+             if not info["Node"].is_directory()]
+    keyed = [((info["Path"], info["Size"], first_cluster(fs, info["Node"])), info) for info in files]
+    with fs.cache_lock:
+        pending = [(key, info) for key, info in keyed if key not in fs.sniff_cache]
+    pending.sort(key=lambda item: item[0][2])
+
+    def sniff(item):
+        key, info = item
+        if not info["Size"]:
+            return "empty", 0.0
+        return classify(fs.read_range(info["Node"], 0, SNIFF_SIZE))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        sniffed = list(pool.map(sniff, pending))
+    with fs.cache_lock:
+        for (key, _), result in zip(pending, sniffed):
+            fs.sniff_cache[key] = result
+        results = [(key, fs.sniff_cache[key]) for key, _ in keyed]
+
+    report = []
+    for (file_path, size, _), (kind, score) in results:
+        report.append({
+            "Path": file_path,
+            "Size": size,
+            "Type": kind,
+            "Entropy": round(score, 3),
+            "Extension mismatch": not extension_matches(file_path, kind),
+        })
+    report.sort(key=lambda item: item["Path"])
+
+    elapsed = time.perf_counter() - start_time
+    stats = {
+        "Files": len(files),
+        "Read": len(pending),
+        "Cached": len(files) - len(pending),
+        "Bytes": sum(min(info["Size"], SNIFF_SIZE) for _, info in pending),
+        "Types": dict(Counter(item["Type"] for item in report).most_common()),
+        "Extension mismatches": sum(item["Extension mismatch"] for item in report),
+        "Seconds": elapsed,
+    }
+    return report, stats
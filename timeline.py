@@ -0,0 +1,137 @@
+import os
+import csv
+import heapq
+import marshal
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Mốc FILETIME (số khoảng 100 ns kể từ 1601-01-01)
+FILETIME_EPOCH = datetime(1601, 1, 1)
+UNIX_EPOCH_FILETIME = 116444736000000000
+# Thứ tự các mốc thời gian trong tuple timestamps của timeline_entries()
+KINDS = ("M", "A", "C", "B")
+
+
+def datetime_to_filetime(dt: datetime) -> int:
+    return (dt - FILETIME_EPOCH) // timedelta(microseconds=1) * 10
+
+
+def filetime_to_datetime(ts: int) -> datetime:
+    return FILETIME_EPOCH + timedelta(microseconds=ts // 10)
+
+
+def filetime_to_unix(ts: int) -> int:
+    return (ts - UNIX_EPOCH_FILETIME) // 10000000
+
+
+def iter_events(fs):
+    """Mỗi mốc thời gian của mỗi entry là một sự kiện (timestamp, nguồn, loại, kích thước, id, đường dẫn)"""
+    for path, size, node_id, source, timestamps in fs.timeline_entries():
+        for kind, ts in zip(KINDS, timestamps):
+            if ts:
+                yield ts, source, kind, size, node_id, path
+
+
+def write_run(events, tmp_dir) -> str:
+    events.sort()
+    fd, path = tempfile.mkstemp(prefix="timeline_", suffix=".run", dir=tmp_dir)
+    with os.fdopen(fd, "wb") as f:
+        for event in events:
+            marshal.dump(event, f)
+    return path
+
+
+def read_run(path):
+    with open(path, "rb") as f:
+        while True:
+            try:
+                yield marshal.load(f)
+            except EOFError:
+                return
+
+
+def merge_runs(runs, tmp_dir, fan_in):
+    # Gộp nhiều lượt khi số run vượt fan_in để số file mở đồng thời có giới hạn
+    while len(runs) > fan_in:
+        merged = []
+        for i in range(0, len(runs), fan_in):
+            group = runs[i:i + fan_in]
+            fd, path = tempfile.mkstemp(prefix="timeline_", suffix=".run", dir=tmp_dir)
+            with os.fdopen(fd, "wb") as f:
+                for event in heapq.merge(*[read_run(r) for r in group]):
+                    marshal.dump(event, f)
+            for r in group:
+                os.remove(r)
+            merged.append(path)
+        runs = merged
+    return runs
+
+
+def sorted_events(fs, chunk_events=500000, tmp_dir=None, fan_in=64):
+    """Sự kiện timeline đã sắp xếp theo thời gian bằng external merge sort.
+
+    Sự kiện được gom thành từng run tối đa chunk_events phần tử, sắp xếp trong bộ
+    nhớ trên timestamp nguyên (FILETIME) rồi ghi ra file tạm dạng marshal; sau đó
+    heapq.merge các run. Bộ nhớ chỉ phụ thuộc chunk_events, không phụ thuộc số file.
+    """
+    runs = []
+    buffer = []
+    try:
+        for event in iter_events(fs):
+            buffer.append(event)
+            if len(buffer) >= chunk_events:
+                runs.append(write_run(buffer, tmp_dir))
+                buffer = []
+        if not runs:
+            # Vừa một run: không cần file tạm
+            buffer.sort()
+            yield from buffer
+            return
+        if buffer:
+            runs.append(write_run(buffer, tmp_dir))
+            buffer = []
+        runs = merge_runs(runs, tmp_dir, fan_in)
+        yield from heapq.merge(*[read_run(r) for r in runs])
+    finally:
+        for r in runs:
+            if os.path.exists(r):
+                os.remove(r)
+
+
+def write_csv(events, out):
+    writer = csv.writer(out)
+    writer.writerow(["Time", "Timestamp", "Source", "Type", "Size", "ID", "Path"])
+    count = 0
+    for ts, source, kind, size, node_id, path in events:
+        writer.writerow([filetime_to_datetime(ts).isoformat(sep=" "), ts, source, kind, size, node_id, path])
+        count += 1
+    return count
+
+
+def write_body(fs, out):
+    """Định dạng body file (mactime): MD5|name|inode|mode|UID|GID|size|atime|mtime|ctime|crtime.
+
+    mactime tự sắp xếp body file nên các dòng được ghi thẳng theo thứ tự duyệt.
+    """
+    count = 0
+    for path, size, node_id, source, timestamps in fs.timeline_entries():
+        m, a, c, b = (filetime_to_unix(ts) if ts else 0 for ts in timestamps)
+        name = path if source != "FN" else f"{path} ($FILE_NAME)"
+        out.write(f"0|{name}|{node_id}|0|0|0|{size}|{a}|{m}|{c}|{b}\n")
+        count += 1
+    return count
+
+
+def export_timeline(fs, out_path, fmt="csv", chunk_events=500000, tmp_dir=None) -> dict:
+    """Ghi timeline MAC của volume ra out_path (fmt: "csv" đã sắp xếp hoặc "body")"""
+    start_time = time.perf_counter()
+    with open(out_path, "w", newline="", encoding="utf-8") as out:
+        if fmt == "csv":
+            count = write_csv(sorted_events(fs, chunk_events, tmp_dir), out)
+        elif fmt == "body":
+            count = write_body(fs, out)
+        else:
+            raise ValueError(f"Unknown timeline format '{fmt}'")
+    elapsed = time.perf_counter() - start_time
+    return {"Rows": count, "Seconds": elapsed}
@@ -0,0 +1,63 @@
+import heapq
+
+
+class UsageTable:
+    """Tổng dung lượng đệ quy (byte, cluster, số file, số thư mục) của mọi thư mục.
+
+    fs.usage_nodes() phải sinh các node theo thứ tự tiền tự (cha trước con) dạng
+    (key, parent_key, path, size, clusters, is_dir). File được cộng thẳng vào thư
+    mục cha, sau đó cộng dồn thư mục con vào cha theo thứ tự ngược (hậu tự), nên
+    toàn bộ chỉ tốn một lượt tuyến tính.
+    """
+    def __init__(self, fs) -> None:
+        self.totals: dict[int, list[int]] = {}
+        self.parents: dict[int, int] = {}
+        self.paths: dict[int, str] = {}
+        self.keys: dict[str, int] = {}
+        self.root = None
+        order = []
+        for key, parent, path, size, clusters, is_dir in fs.usage_nodes():
+            if is_dir:
+                if key in self.totals:
+                    continue
+                self.totals[key] = [0, clusters, 0, 0]
+                self.paths[key] = path
+                self.keys[path.casefold()] = key
+                if parent is None or parent not in self.totals:
+                    self.root = key if self.root is None else self.root
+                else:
+                    self.parents[key] = parent
+                    order.append(key)
+            elif parent in self.totals:
+                total = self.totals[parent]
+                total[0] += size
+                total[1] += clusters
+                total[2] += 1
+
+        for key in reversed(order):
+            total = self.totals[key]
+            parent_total = self.totals[self.parents[key]]
+            parent_total[0] += total[0]
+            parent_total[1] += total[1]
+            parent_total[2] += total[2]
+            parent_total[3] += total[3] + 1
+
+    def info(self, key) -> dict:
+        size, clusters, files, dirs = self.totals[key]
+        return {
+            "Path": self.paths[key],
+            "Size": size,
+            "Clusters": clusters,
+            "Files": files,
+            "Directories": dirs,
+        }
+
+    def du(self, path="") -> dict:
+        key = self.root if path in ("", "\\") else self.keys.get(path.strip("\\").casefold())
+        if key is None:
+            raise NotADirectoryError(f"'{path}' is not a directory")
+        return self.info(key)
+
+    def largest(self, n=10) -> 'list[dict]':
+        keys = heapq.nlargest(n, (k for k in self.totals if k != self.root), key=lambda k: self.totals[k][0])
+        return [self.info(k) for k in keys]